@@ -0,0 +1,61 @@
+"""
+Distances from every place to the location presets: NumPy `CoordArray` vs. the pure Python fallback.
+Also checks that both paths agree.
+
+Run from the repository root: python -m benchmarks.bench_distances
+"""
+import json
+import time
+
+from benchmarks.synthetic import make_places
+from src.google_maps_tool.models.coord_array import CoordArray, load_numpy
+
+SIZES = (1_000, 10_000, 100_000)
+CHECK_SIZE = 10_000
+TOLERANCE_KM = 1e-9
+
+
+def _load_centers() -> list[tuple[float, float]]:
+    with open('locations.json', 'r', encoding='utf-8') as f:
+        return [(p['lat'], p['lon']) for p in json.load(f).values()]
+
+
+def check():
+    """The NumPy and the Python distance matrices agree, if NumPy is installed."""
+    np = load_numpy()
+    if np is None:
+        return
+
+    places = make_places(CHECK_SIZE)
+    centers = _load_centers()
+    expected = CoordArray.from_places(places, use_numpy=False).distance_matrix(centers)
+    actual = CoordArray.from_places(places, use_numpy=True).distance_matrix(centers)
+    assert float(np.max(np.abs(actual - np.array(expected)))) <= TOLERANCE_KM, 'NumPy and Python disagree'
+
+
+def main():
+    np = load_numpy()
+    if np is None:
+        print('NumPy is not installed, nothing to compare.')
+        return
+
+    centers = _load_centers()
+
+    print(f'{"places":>8} {"python (ms)":>12} {"numpy (ms)":>11} {"speedup":>8}')
+    for size in SIZES:
+        places = make_places(size)
+
+        started_at = time.perf_counter()
+        expected = CoordArray.from_places(places, use_numpy=False).distance_matrix(centers)
+        python = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        actual = CoordArray.from_places(places, use_numpy=True).distance_matrix(centers)
+        vectorized = time.perf_counter() - started_at
+
+        assert float(np.max(np.abs(actual - np.array(expected)))) <= TOLERANCE_KM, 'NumPy and Python disagree'
+        print(f'{size:>8} {python * 1000:>12.2f} {vectorized * 1000:>11.2f} {python / vectorized:>7.0f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Startup cost of the command line entry, measured with `python -X importtime` in fresh interpreters:
+importing the CLI, and setting up the service the way a command does (without sending anything).
+Fails if either goes over its budget, or pulls in a module that should only load on first use.
+
+Run from the repository root: python -m benchmarks.bench_import
+The exit code is 1 on a regression, so it can run in CI next to `benchmarks.suite`.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only needed once a request is sent, or by a few commands
+DEFERRED_MODULES = ('requests', 'urllib3', 'numpy', 'aiohttp', 'pyarrow',
+                    'src.google_maps_tool.ui.menu',
+                    'src.google_maps_tool.service.sorting',
+                    'src.google_maps_tool.service.verification')
+
+SCENARIOS = {
+    # What `main.py --help` and argument errors pay
+    'import cli': 'import src.google_maps_tool.cli',
+    # What a command answered from the caches pays before its first lookup
+    'create service': 'from src.google_maps_tool import cli; cli.create_service("cookies.json")',
+}
+DEFAULT_BUDGETS_MS = {'import cli': 40.0, 'create service': 120.0}
+# The interpreter's own startup, the same for every entry point
+STARTUP_MODULES = ('site', 'encodings')
+
+
+def import_times(code: str, cwd: str) -> tuple[dict[str, int], list[str]]:
+    """Cumulative import time in µs of every top-level import of `code`, and the deferred modules it loaded."""
+    check = f'{code}\nimport sys\nprint(",".join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', check], cwd=cwd, capture_output=True,
+                            text=True, check=True, env=dict(os.environ, PYTHONPATH=REPO_ROOT))
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total, name = line[len('import time:'):].split('|')
+        # Top-level imports aren't indented, the ones they trigger are already in their cumulative time
+        if not name.startswith('  '):
+            cumulative[name.strip()] = int(total)
+
+    loaded = result.stdout.strip()
+    return cumulative, loaded.split(',') if loaded else []
+
+
+def measure(code: str, cwd: str, repeat: int) -> tuple[float, dict[str, int], list[str]]:
+    """Best total of `repeat` runs in ms, with the per-module times and deferred modules of that run."""
+    best = None
+    for _ in range(repeat):
+        cumulative, loaded = import_times(code, cwd)
+        total = sum(us for name, us in cumulative.items() if name not in STARTUP_MODULES) / 1000
+        if best is None or total < best[0]:
+            best = total, cumulative, loaded
+    return best
+
+
+def check(budgets_ms: dict[str, float] = DEFAULT_BUDGETS_MS, repeat: int = 5, top: int = 0) -> list[str]:
+    """Scenarios over their budget or loading a deferred module, empty if none. Prints the `top` slowest imports."""
+    failures = []
+    # Run elsewhere, so that creating the service doesn't leave cache files in the repository
+    with tempfile.TemporaryDirectory() as cwd:
+        for scenario, code in SCENARIOS.items():
+            budget = budgets_ms[scenario]
+            total, cumulative, loaded = measure(code, cwd, repeat)
+
+            print(f'{scenario}: {total:.1f} ms (budget {budget:.0f} ms)')
+            slowest = sorted((item for item in cumulative.items() if item[0] not in STARTUP_MODULES),
+                             key=lambda item: -item[1])
+            for name, us in slowest[:top]:
+                print(f'  {us / 1000:>8.1f} ms  {name}')
+
+            if total > budget:
+                failures.append(f'`{scenario}` took {total:.1f} ms, over its {budget:.0f} ms budget')
+            if loaded:
+                failures.append(f'`{scenario}` imported {", ".join(loaded)}, which should load on first use')
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Import time of the command line entry.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help='slowest imports to show per scenario')
+    for scenario, budget in DEFAULT_BUDGETS_MS.items():
+        parser.add_argument(f'--budget-{scenario.replace(" ", "-")}', type=float, default=budget,
+                            help=f'ms allowed for `{scenario}`')
+    args = parser.parse_args(argv)
+
+    budgets_ms = {scenario: getattr(args, f'budget_{scenario.replace(" ", "_")}') for scenario in SCENARIOS}
+    failures = check(budgets_ms, args.repeat, args.top)
+    for failure in failures:
+        print(f'REGRESSION: {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
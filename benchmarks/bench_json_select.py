@@ -0,0 +1,84 @@
+"""
+Decoding the part of a response a model reads: `json.loads(text[4:])` on the whole body vs. `json_select.select`.
+Reports time and peak memory (tracemalloc) on synthetic `mas`, `getlist` and `place` shaped bodies.
+
+Run from the repository root: python -m benchmarks.bench_json_select
+"""
+import json
+import random
+import timeit
+import tracemalloc
+
+from src.google_maps_tool.service import json_select
+
+
+def nested_noise(rng: random.Random, size: int) -> list:
+    return [[rng.random(), f'text {i}', [None, i, [rng.random()] * 3]] for i in range(size)]
+
+
+def mas_body(rng: random.Random) -> str:
+    data: list = [nested_noise(rng, 200) for _ in range(40)]
+    data[29] = [None, None, None, [[[f'list {i}'], None, None, None, f'List {i}'] + [None] * 7 + [i]
+                                   for i in range(50)]]
+    return ")]}'\n" + json.dumps(data)
+
+
+def getlist_body(rng: random.Random) -> str:
+    place = [None, [None] * 5 + [[None, None, 44.4, 26.1]], 'Some place'] + [None] * 5 + [[None, ['1', '2']]]
+    return ")]}'\n" + json.dumps([[None] * 8 + [[place] * 500] + nested_noise(rng, 50), nested_noise(rng, 500)])
+
+
+def place_body(rng: random.Random) -> str:
+    data: list = [nested_noise(rng, 20) for _ in range(6)]
+    data.append([None, None, ['Street 1', 'City']] + nested_noise(rng, 300))
+    data.extend(nested_noise(rng, 3000) for _ in range(4))
+    return ")]}'\n" + json.dumps(data)
+
+
+def peak_memory(fn) -> int:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def make_bodies() -> dict[str, tuple[str, tuple[int, ...]]]:
+    """Body and path of the part the model reads, per endpoint."""
+    rng = random.Random(7)
+    return {'mas': (mas_body(rng), (29, 3)), 'getlist': (getlist_body(rng), (0, 8)), 'place': (place_body(rng), (6,))}
+
+
+def load_all(text: str, path: tuple[int, ...]):
+    data = json.loads(text[4:])
+    for position in path:
+        data = data[position]
+    return data
+
+
+def check():
+    """`select` returns the same part as decoding the whole body."""
+    for name, (text, path) in make_bodies().items():
+        assert load_all(text, path) == json_select.select(text, *path), name
+
+
+def main():
+    check()
+    print(f'{"body":<8} {"size (KB)":>10} {"loads (ms)":>11} {"select (ms)":>12} {"loads peak (KB)":>16} '
+          f'{"select peak (KB)":>17}')
+    for name, (text, path) in make_bodies().items():
+        def load_whole():
+            return load_all(text, path)
+
+        def load_selected():
+            return json_select.select(text, *path)
+
+        rounds = 20
+        before = timeit.timeit(load_whole, number=rounds) / rounds
+        after = timeit.timeit(load_selected, number=rounds) / rounds
+        print(f'{name:<8} {len(text) / 1024:>10.0f} {before * 1000:>11.2f} {after * 1000:>12.2f} '
+              f'{peak_memory(load_whole) / 1024:>16.0f} {peak_memory(load_selected) / 1024:>17.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Memory held by the places of a list: the old `__dict__`-based models vs. the slotted `GMPlace`
+and the columnar `PlaceTable`. Also checks that the table hands back the same places and keeps their details.
+
+Run from the repository root: python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+
+from benchmarks.synthetic import make_places
+from src.google_maps_tool.models.place import GMPlaceDetails
+from src.google_maps_tool.models.place_table import PlaceTable
+
+SIZES = (1_000, 10_000, 100_000)
+CHECK_SIZE = 10_000
+_DETAILS = GMPlaceDetails('Short name', ('', '', ''), '', 4.5, 10, '', 'Restaurant', [], [], '', '')
+
+
+class _DictCoord:
+    """`GMCoord` as it was before `__slots__`."""
+
+    def __init__(self, lat, long):
+        self.lat = lat
+        self.long = long
+
+
+class _DictPlace:
+    """`GMPlace` as it was before `__slots__`."""
+
+    def __init__(self, name, lat, long, secret_1, secret_2, service):
+        self.name = name
+        self.coord = _DictCoord(lat, long)
+        self.secret_1 = secret_1
+        self.secret_2 = secret_2
+        self._service = service
+        self._details = None
+
+
+def measure(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def check():
+    """The table hands back the places it was built from, and keeps the details loaded on its views."""
+    places = make_places(CHECK_SIZE)
+    table = PlaceTable.from_places(places)
+    assert list(table) == places, 'PlaceTable lost places'
+    assert [p.name for p in table] == [p.name for p in places], 'PlaceTable changed names'
+
+    table[0].details = _DETAILS
+    assert table[0].details is _DETAILS and not table[1].has_details, 'PlaceTable lost loaded details'
+
+
+def main():
+    check()
+    print(f'{"places":>8} {"dict (KiB)":>11} {"slots (KiB)":>12} {"table (KiB)":>12} {"table/dict":>11}')
+    for size in SIZES:
+        # Every layout builds the same places from scratch, so names and numbers are counted in all of them
+        _, dict_bytes = measure(lambda: [_DictPlace(p.name, p.coord.lat, p.coord.long, p.secret_1, p.secret_2, None)
+                                         for p in make_places(size)])
+        _, slots_bytes = measure(lambda: make_places(size))
+        _, table_bytes = measure(lambda: PlaceTable.from_places(make_places(size)))
+
+        print(f'{size:>8} {dict_bytes / 1024:>11.0f} {slots_bytes / 1024:>12.0f} {table_bytes / 1024:>12.0f} '
+              f'{table_bytes / dict_bytes:>10.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Decoding `pb` strings: the regex/slicing `GoogleMapsDataParser.decode` vs. the single-pass `decode_single_pass`.
+Before timing, checks on random messages that both decoders agree and that decoding round-trips with `encode`.
+
+Run from the repository root: python -m benchmarks.bench_pb_decode
+"""
+import random
+import timeit
+
+from src.google_maps_parser.gmaps_data_parser import GoogleMapsDataParser
+from src.google_maps_tool.models.place import _details_template
+
+ROUND_TRIP_CASES = 2_000
+SIZES = (1, 10, 100)
+
+
+def random_message(rng: random.Random, depth: int = 0) -> dict:
+    message = {}
+    duplicate_index = 1
+    for _ in range(rng.randint(0, 6)):
+        key = str(rng.randint(1, 40))
+        if depth < 4 and rng.random() < 0.3:
+            value = random_message(rng, depth + 1)
+        else:
+            value = rng.choice('bdefisuvxyz') + rng.choice(['', '0', '1', '42', '-3.5', 'some+text', '0x1f:0x2e'])
+
+        # Same naming as the decoder uses for repeated keys
+        if key in message:
+            key = f'{key}_{duplicate_index}'
+            duplicate_index += 1
+        message[key] = value
+    return message
+
+
+def check_round_trips():
+    rng = random.Random(1234)
+    for _ in range(ROUND_TRIP_CASES):
+        message = random_message(rng)
+        encoded = GoogleMapsDataParser.encode(message)
+
+        decoded = GoogleMapsDataParser.decode_single_pass(encoded)
+        assert decoded == message, encoded
+        assert decoded == GoogleMapsDataParser.decode(encoded), encoded
+        assert GoogleMapsDataParser.encode(decoded) == encoded, encoded
+
+
+def large_message(copies: int) -> str:
+    """The place details payload repeated `copies` times as sub-messages."""
+    details = _details_template(True).to_dict(lat=44.4268, long=26.1025, session_id='SESSION',
+                                              name='Some+place', secrets='0x1a2b:0x3c4d')
+    return GoogleMapsDataParser.encode({'1': {str(i + 1): details for i in range(copies)}})
+
+
+def check():
+    """Both decoders agree, on random messages and on the large payloads that are timed."""
+    check_round_trips()
+    for copies in SIZES:
+        encoded = large_message(copies)
+        assert GoogleMapsDataParser.decode(encoded) == GoogleMapsDataParser.decode_single_pass(encoded), copies
+
+
+def main():
+    check()
+    print(f'Round trips OK ({ROUND_TRIP_CASES} random messages)\n')
+
+    print(f'{"tokens":>8} {"decode (ms)":>12} {"single pass (ms)":>17} {"speedup":>8}')
+    for copies in SIZES:
+        encoded = large_message(copies)
+        rounds = max(1, 200 // copies)
+        before = timeit.timeit(lambda: GoogleMapsDataParser.decode(encoded), number=rounds) / rounds
+        after = timeit.timeit(lambda: GoogleMapsDataParser.decode_single_pass(encoded), number=rounds) / rounds
+        print(f'{encoded.count("!"):>8} {before * 1000:>12.2f} {after * 1000:>17.2f} {before / after:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Per-request cost of building the `pb` parameter: filling in the message dict and running
+`GoogleMapsDataParser.encode` on it (the former approach) vs. rendering the precompiled `PbTemplate`.
+
+Run from the repository root: python -m benchmarks.bench_pb_encode
+"""
+import timeit
+
+from src.google_maps_parser.gmaps_data_parser import GoogleMapsDataParser
+from src.google_maps_tool.models.place import _add_template, _details_template
+from src.google_maps_tool.service.endpoints import _get_all_lists_template, _get_list_template
+
+ROUNDS = 2_000
+
+PAYLOADS = {
+    'place details': (_details_template(True), {'lat': 44.4268, 'long': 26.1025, 'session_id': 'SESSION',
+                                                'name': 'Some+place', 'secrets': '0x1a2b:0x3c4d'}),
+    'place details (coords only)': (_details_template(False), {'lat': 44.4268, 'long': 26.1025,
+                                                               'session_id': 'SESSION', 'name': 'Some+place'}),
+    'createitem': (_add_template(True), {'list_id': 'LIST', 'lat': 44.4268, 'long': 26.1025,
+                                         'session_id': 'SESSION:34', 'list_position': '1i:1,t:39790,e:0,p:S:34',
+                                         'list_type': 39790, 'service_token': 'TOKEN', 'name': 'Some place',
+                                         'secret_1': 123456789, 'secret_2': 987654321}),
+    'mas': (_get_all_lists_template(), {'session_token': 'SESSION'}),
+    'getlist': (_get_list_template(False), {'list_id': 'LIST', 'page_size': 500, 'session_token': 'SESSION'}),
+}
+
+
+def check():
+    """Every template renders the same `pb` as encoding its message."""
+    for name, (template, values) in PAYLOADS.items():
+        assert template.render(**values) == GoogleMapsDataParser.encode(template.to_dict(**values)), name
+
+
+def main():
+    check()
+    print(f'{"payload":<28} {"encode (µs)":>12} {"template (µs)":>14} {"speedup":>8}')
+    for name, (template, values) in PAYLOADS.items():
+        before = timeit.timeit(lambda: GoogleMapsDataParser.encode(template.to_dict(**values)), number=ROUNDS)
+        after = timeit.timeit(lambda: template.render(**values), number=ROUNDS)
+        print(f'{name:<28} {before / ROUNDS * 1e6:>12.1f} {after / ROUNDS * 1e6:>14.2f} {before / after:>7.0f}x')
+
+
+if __name__ == '__main__':
+    main()
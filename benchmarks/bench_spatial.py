@@ -0,0 +1,56 @@
+"""
+Radius queries through `GMList.filter_by_radius` (grid index) vs. the former linear haversine scan.
+
+Run from the repository root: python -m benchmarks.bench_spatial
+"""
+import json
+import time
+
+from benchmarks.synthetic import make_list
+
+SIZES = (1_000, 10_000, 100_000)
+CHECK_SIZE = 10_000
+
+
+def linear_scan(gmlist, center_lat, center_lon, radius_km):
+    return [place for place in gmlist.places if place.coord.distance_to(center_lat, center_lon) <= radius_km]
+
+
+def _load_presets() -> list[dict]:
+    with open('locations.json', 'r', encoding='utf-8') as f:
+        return list(json.load(f).values())
+
+
+def check():
+    """The index finds the same places as the linear scan, around every location preset."""
+    gmlist = make_list(CHECK_SIZE)
+    for p in _load_presets():
+        actual = gmlist.filter_by_radius(p['lat'], p['lon'], p['radius_km'])
+        assert actual == linear_scan(gmlist, p['lat'], p['lon'], p['radius_km']), 'index and linear scan disagree'
+
+
+def main():
+    presets = _load_presets()
+
+    print(f'{"places":>8} {"linear (ms)":>12} {"index build (ms)":>17} {"index query (ms)":>17} {"speedup":>8}')
+    for size in SIZES:
+        gmlist = make_list(size)
+
+        started_at = time.perf_counter()
+        expected = [linear_scan(gmlist, p['lat'], p['lon'], p['radius_km']) for p in presets]
+        linear = (time.perf_counter() - started_at) / len(presets)
+
+        started_at = time.perf_counter()
+        gmlist.spatial_index
+        build = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        actual = [gmlist.filter_by_radius(p['lat'], p['lon'], p['radius_km']) for p in presets]
+        query = (time.perf_counter() - started_at) / len(presets)
+
+        assert actual == expected, 'index and linear scan disagree'
+        print(f'{size:>8} {linear * 1000:>12.2f} {build * 1000:>17.2f} {query * 1000:>17.3f} {linear / query:>7.0f}x')
+
+
+if __name__ == '__main__':
+    main()
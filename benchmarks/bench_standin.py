@@ -0,0 +1,69 @@
+"""
+Throughput of the service against the local stand-in server, under a fixed injected latency:
+paging a large list, loading details, and bulk adds with different worker counts.
+Also checks that every add ends up in the stand-in's list.
+
+Run from the repository root: python -m benchmarks.bench_standin
+"""
+import time
+
+from requests.cookies import RequestsCookieJar
+
+from src.google_maps_tool.service.context import GoogleMapsContext
+from src.google_maps_tool.service.maps_service import GoogleMapsService
+from src.google_maps_tool.service.transport import TransportConfig, create_session
+from src.google_maps_tool.standin_server import FaultConfig, StandInServer, make_synthetic_lists
+
+LIST_SIZE = 5_000
+DETAILS = 50
+ADDS = 200
+WORKER_COUNTS = (1, 4, 8)
+LATENCY_SECONDS = 0.02
+
+
+def make_service(server: StandInServer, pool_size: int) -> GoogleMapsService:
+    transport = TransportConfig(pool_size=pool_size)
+    session = create_session(RequestsCookieJar(), transport)
+    return GoogleMapsService(GoogleMapsContext(session, transport=transport, base_url=server.base_url))
+
+
+def main():
+    lists = make_synthetic_lists([LIST_SIZE] + [0] * len(WORKER_COUNTS))
+    faults = FaultConfig(latency_seconds=LATENCY_SECONDS)
+
+    with StandInServer(lists, faults, port=0) as server:
+        print(f'stand-in at {server.base_url}, {LATENCY_SECONDS * 1000:.0f} ms latency per request\n')
+
+        service = make_service(server, max(WORKER_COUNTS))
+        source = service.get_all_lists()[0]
+
+        started_at = time.perf_counter()
+        places = service.get_all_places(source)
+        elapsed = time.perf_counter() - started_at
+        assert len(places) == LIST_SIZE, 'Paging lost places'
+        print(f'getlist: {LIST_SIZE} places in {elapsed:.2f}s ({LIST_SIZE / elapsed:,.0f} places/s)')
+
+        started_at = time.perf_counter()
+        for place in places[:DETAILS]:
+            service.load_place_details(place)
+        elapsed = time.perf_counter() - started_at
+        print(f'place:   {DETAILS} details in {elapsed:.2f}s ({DETAILS / elapsed:.1f} req/s)\n')
+
+        print(f'{"workers":>8} {"adds":>6} {"time (s)":>9} {"adds/s":>8}')
+        for workers in WORKER_COUNTS:
+            service = make_service(server, workers)
+            destination = next(gmlist for gmlist in service.get_all_lists() if gmlist.places_count == 0)
+
+            started_at = time.perf_counter()
+            # No throttling, to measure the transport rather than the rate limiter
+            results = service.add_places_to_list(places[:ADDS], destination, max_workers=workers,
+                                                 requests_per_second=10_000, burst=workers)
+            elapsed = time.perf_counter() - started_at
+
+            assert all(result.success for result in results), 'Some adds failed'
+            assert len(server.find_list(destination.id).places) == ADDS, 'The stand-in is missing adds'
+            print(f'{workers:>8} {ADDS:>6} {elapsed:>9.2f} {ADDS / elapsed:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Runs the command line examples of the README's "Scripted use" section against the local stand-in server,
+with lists named like in the examples, and fails if any of them doesn't exit with 0.
+
+Run from the repository root: python -m benchmarks.check_cli
+"""
+import importlib.util
+import json
+import os
+import random
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from src.google_maps_tool.standin_server import (FaultConfig, StandInList, StandInPlace, StandInServer,
+                                                 make_synthetic_places)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMAND_PREFIX = 'python main.py '
+
+
+def documented_commands(readme_path: str = os.path.join(REPO_ROOT, 'README.md')) -> list[str]:
+    """The `python main.py ...` lines of the README's code blocks."""
+    with open(readme_path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip().startswith(COMMAND_PREFIX)]
+
+
+def example_lists() -> list[StandInList]:
+    """The lists the examples refer to; the source has places around every preset of locations.json."""
+    with open(os.path.join(REPO_ROOT, 'locations.json'), 'r', encoding='utf-8') as f:
+        presets = json.load(f)
+
+    rng = random.Random(7)
+    places = make_synthetic_places(200, rng)
+    for name, preset in presets.items():
+        places += [StandInPlace(f'{name} spot {idx}', preset['lat'] + rng.uniform(-0.02, 0.02),
+                                preset['lon'] + rng.uniform(-0.02, 0.02),
+                                rng.getrandbits(64) - (1 << 63), rng.getrandbits(64) - (1 << 63))
+                   for idx in range(5)]
+
+    return [StandInList('want-to-go', 'Want to go', places),
+            StandInList('bucharest', 'Bucharest'),
+            StandInList('trip', 'Trip'),
+            StandInList('greece', 'Greece')]
+
+
+def check() -> list[str]:
+    """Failures of the documented commands, empty if they all succeeded."""
+    failures = []
+    with StandInServer(example_lists(), FaultConfig(), port=0) as server, \
+            tempfile.TemporaryDirectory() as cwd:
+        with open(os.path.join(cwd, 'cookies.json'), 'w', encoding='utf-8') as f:
+            json.dump({}, f)
+        shutil.copy(os.path.join(REPO_ROOT, 'locations.json'), cwd)
+
+        for command in documented_commands():
+            if '.parquet' in command and importlib.util.find_spec('pyarrow') is None:
+                print(f'skipped (needs pyarrow): {command}')
+                continue
+
+            argv = shlex.split(command[len(COMMAND_PREFIX):])
+            result = subprocess.run([sys.executable, os.path.join(REPO_ROOT, 'main.py'),
+                                     '--base-url', server.base_url, *argv],
+                                    cwd=cwd, capture_output=True, text=True,
+                                    env=dict(os.environ, PYTHONPATH=REPO_ROOT))
+            print(f'exit {result.returncode}: {command}')
+            if result.returncode != 0:
+                failures.append(f'`{command}` exited with {result.returncode}: {result.stderr.strip()[-500:]}')
+
+    return failures
+
+
+def main() -> int:
+    failures = check()
+    for failure in failures:
+        print(f'FAILED: {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
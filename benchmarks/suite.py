@@ -0,0 +1,258 @@
+"""
+Benchmark suite for the parser, models and list operations, on synthetic responses shaped like the real
+`mas`, `getlist` and `place` payloads (rendered by the stand-in server), at 1k, 10k and 100k places.
+Results are written to a JSON file; pass a previous one as `--baseline` to flag regressions.
+
+Run from the repository root:
+    python -m benchmarks.suite --output bench_results.json
+    python -m benchmarks.suite --baseline bench_results.json --output bench_new.json
+    python -m benchmarks.suite --check
+The exit code is 1 if any case got slower than the baseline by more than `--threshold`. `--check` runs the
+correctness checks of the benchmark scripts instead (faster paths agree with the ones they replace, import
+budget, README commands) and exits with 1 if one fails.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from dataclasses import dataclass
+from typing import Callable
+
+from benchmarks import (bench_distances, bench_import, bench_json_select, bench_memory, bench_pb_decode,
+                        bench_pb_encode, bench_spatial, check_cli)
+from benchmarks.synthetic import make_list, make_places
+from src.google_maps_parser.gmaps_data_parser import GoogleMapsDataParser
+from src.google_maps_tool.models.list import GMList
+from src.google_maps_tool.service import endpoints
+from src.google_maps_tool.standin_server import (StandInList, StandInPlace, render_list_response,
+                                                 render_lists_response, render_place_response)
+
+SIZES = (1_000, 10_000, 100_000)
+DEFAULT_THRESHOLD = 0.20
+SESSION_TOKEN = 'benchmark-session'
+
+
+@dataclass
+class Case:
+    name: str
+    # Gets the number of places, prepares the input and returns the function to time
+    setup: Callable[[int], Callable[[], object]]
+    description: str
+    # The setup builds one item (payload, list, body) per `places_per_item` places, the times are per item
+    places_per_item: int = 1
+
+    def items(self, size: int) -> int:
+        return size // self.places_per_item
+
+
+def _standin_places(size: int) -> list[StandInPlace]:
+    return [StandInPlace(place.name, place.coord.lat, place.coord.long, place.secret_1, place.secret_2)
+            for place in make_places(size)]
+
+
+def _load_presets() -> list[dict]:
+    with open('locations.json', 'r', encoding='utf-8') as f:
+        return list(json.load(f).values())
+
+
+def encode_details(size: int):
+    places = make_places(size)
+    return lambda: [place.build_get_details_payload(SESSION_TOKEN) for place in places]
+
+
+def _details_payloads(size: int) -> list[str]:
+    # Decoding is much slower than encoding, one payload per 10 places keeps the 100k run short
+    return [place.build_get_details_payload(SESSION_TOKEN) for place in make_places(size // 10)]
+
+
+def decode_details(size: int):
+    payloads = _details_payloads(size)
+    return lambda: [GoogleMapsDataParser.decode(payload) for payload in payloads]
+
+
+def decode_details_single_pass(size: int):
+    payloads = _details_payloads(size)
+    return lambda: [GoogleMapsDataParser.decode_single_pass(payload) for payload in payloads]
+
+
+def parse_getlist(size: int):
+    places = _standin_places(size)
+    # One response per page, like the service receives them
+    pages = [render_list_response(StandInList('benchmark', 'Benchmark', places),
+                                  places[offset:offset + endpoints.LIST_PAGE_SIZE])
+             for offset in range(0, size, endpoints.LIST_PAGE_SIZE)]
+    return lambda: [endpoints.places_from_response(page, service=None) for page in pages]
+
+
+def parse_mas(size: int):
+    # A list per 100 places, each with its count
+    lists = [StandInList(f'list-{idx}', f'List {idx}', []) for idx in range(size // 100)]
+    body = render_lists_response(lists)
+    return lambda: endpoints.lists_from_response(body, service=None)
+
+
+def parse_place(size: int):
+    # A details response per 100 places, as when prefetching them
+    bodies = [render_place_response(place, []) for place in _standin_places(size // 100)]
+    return lambda: [endpoints.place_details_from_response(body) for body in bodies]
+
+
+def filter_by_radius(size: int):
+    gmlist = make_list(size)
+    presets = _load_presets()
+
+    def run():
+        # Includes building the index, like the first query on a freshly loaded list
+        gmlist._invalidate_indexes()
+        return [gmlist.filter_by_radius(preset['lat'], preset['lon'], preset['radius_km']) for preset in presets]
+
+    return run
+
+
+def diff_lists(size: int):
+    # Destination holds every other place of the source, like a half-sorted list
+    source = make_list(size)
+    destination = GMList('destination', 'Destination', 0, 1, service=None)
+    destination._places = list(source.places[::2])
+    return lambda: destination.missing_from(source)
+
+
+CASES = [
+    Case('pb.encode_details', encode_details, 'build the details `pb` of every place'),
+    Case('pb.decode_details', decode_details, '`GoogleMapsDataParser.decode` of the details `pb`, one per 10 places',
+         places_per_item=10),
+    Case('pb.decode_single_pass', decode_details_single_pass,
+         '`GoogleMapsDataParser.decode_single_pass` of the same payloads', places_per_item=10),
+    Case('parse.getlist', parse_getlist, 'GMPlace models from all `getlist` pages'),
+    Case('parse.mas', parse_mas, 'GMList models from a `mas` body, a list per 100 places', places_per_item=100),
+    Case('parse.place', parse_place, 'GMPlaceDetails from `place` bodies, one per 100 places', places_per_item=100),
+    Case('list.filter_by_radius', filter_by_radius, 'index build + one radius query per location preset'),
+    Case('list.diff', diff_lists, 'places of the source missing from a half-filled destination'),
+]
+
+
+# Return the problems they found, or raise an AssertionError
+CHECKS: dict[str, Callable[[], list[str] | None]] = {
+    'pb decoders agree and round-trip': bench_pb_decode.check,
+    'pb templates render like encode': bench_pb_encode.check,
+    'json_select reads the same part': bench_json_select.check,
+    'NumPy and Python distances agree': bench_distances.check,
+    'grid index matches the linear scan': bench_spatial.check,
+    'PlaceTable keeps places and details': bench_memory.check,
+    'imports within budget': bench_import.check,
+    'README commands succeed': check_cli.check,
+}
+
+
+def run_checks() -> list[str]:
+    """Failures of all `CHECKS`, empty if they passed."""
+    failures = []
+    for name, check in CHECKS.items():
+        try:
+            problems = check() or []
+        except AssertionError as e:
+            problems = [str(e)[:200] or 'assertion failed']
+        print(f'{"FAILED" if problems else "ok":<6} {name}')
+        failures += [f'{name}: {problem}' for problem in problems]
+    return failures
+
+
+def run_case(case: Case, size: int, repeat: int) -> dict:
+    fn = case.setup(size)
+    # Best of `repeat`, the least disturbed by the rest of the machine
+    best = min(timeit.repeat(fn, number=1, repeat=repeat))
+    items = case.items(size)
+    return {'case': case.name, 'description': case.description, 'size': size, 'items': items,
+            'seconds': best, 'per_item_us': best / items * 1e6 if items else None}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[dict]:
+    """Cases that are slower than in `baseline` by more than `threshold` (0.2 = 20%)."""
+    previous = {(result['case'], result['size']): result['seconds'] for result in baseline['results']}
+
+    regressions = []
+    for result in results:
+        before = previous.get((result['case'], result['size']))
+        result['baseline_seconds'] = before
+        result['change'] = None if not before else result['seconds'] / before - 1
+        if result['change'] is not None and result['change'] > threshold:
+            regressions.append(result)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Offline benchmarks of the parser, models and list operations.')
+    parser.add_argument('--output', default='bench_results.json', help='where to write the results')
+    parser.add_argument('--baseline', help='results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='slowdown that counts as a regression, 0.2 = 20%%')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', help='run only the cases whose name starts with one of these')
+    parser.add_argument('--check', action='store_true',
+                        help='run the correctness checks instead of the timings, exit with 1 if one fails')
+    args = parser.parse_args(argv)
+
+    if args.check:
+        if not __debug__:
+            parser.error('--check relies on asserts, run it without -O')
+        failures = run_checks()
+        for failure in failures:
+            print(f'FAILED: {failure}')
+        return 1 if failures else 0
+
+    cases = [case for case in CASES if not args.only or any(case.name.startswith(prefix) for prefix in args.only)]
+
+    results = []
+    print(f'{"case":<24} {"places":>8} {"time (ms)":>10} {"µs/item":>9}')
+    for case in cases:
+        for size in args.sizes:
+            result = run_case(case, size, args.repeat)
+            results.append(result)
+            per_item = f'{result["per_item_us"]:>9.3f}' if result['per_item_us'] is not None else f'{"-":>9}'
+            print(f'{case.name:<24} {size:>8} {result["seconds"] * 1000:>10.2f} {per_item}')
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+        print(f'\nCompared with {args.baseline}:')
+        for result in results:
+            if result['change'] is not None:
+                flag = '  REGRESSION' if result in regressions else ''
+                print(f'{result["case"]:<24} {result["size"]:>8} {result["change"]:>+9.1%}{flag}')
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+        'regressions': [(result['case'], result['size']) for result in regressions],
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nWrote {args.output}')
+
+    if regressions:
+        print(f'{len(regressions)} regression(s) above {args.threshold:.0%}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import random
+
+from src.google_maps_tool.models.list import GMList
+from src.google_maps_tool.models.place import GMPlace
+from src.google_maps_tool.standin_server import make_synthetic_places
+
+
+def make_places(count: int, seed: int = 42) -> list[GMPlace]:
+    """The places the stand-in server would serve for a list of `count`, as models."""
+    return [GMPlace(place.name, place.lat, place.long, place.secret_1, place.secret_2, service=None)
+            for place in make_synthetic_places(count, random.Random(seed))]
+
+
+def make_list(count: int, seed: int = 42, name: str = 'Synthetic') -> GMList:
+    gmlist = GMList(f'synthetic-{count}', name, count, 0, service=None)
+    gmlist._places = make_places(count, seed)
+    return gmlist
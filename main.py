@@ -1,29 +1,28 @@
 from __future__ import annotations
 
-import requests
 import sys
 
-from src.google_maps_tool.config.config import load_cookies
-from src.google_maps_tool.service.context import GoogleMapsContext
-from src.google_maps_tool.ui.menu import main_menu
-from src.google_maps_tool.service.maps_service import GoogleMapsService
+# Where the request and cache stats are written on exit, None to skip
+METRICS_FILE = "gmaps_metrics.json"
 
 if __name__ == '__main__':
-    current_session = requests.Session()
-    current_session.cookies = load_cookies("cookies.json")
-    current_session.headers = {
-        "accept": "*/*",
-        "accept-language": "en-GB,en;q=0.9,fr-FR;q=0.8,fr;q=0.7,ro-RO;q=0.6,ro;q=0.5,en-US;q=0.4",
-        "priority": "u=1, i",
-        "x-maps-diversion-context-bin": "CAE=",
-        "Referer": "https://www.google.com/",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36",
-    }
+    # With arguments, run a single command and exit (see `python main.py --help`).
+    # Only what that path needs is imported, the menu tree is left out
+    if len(sys.argv) > 1:
+        from src.google_maps_tool.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
 
-    context = GoogleMapsContext(current_session)
-    service = GoogleMapsService(context)
+    from src.google_maps_tool.cli import create_service
+    from src.google_maps_tool.service.metrics import Metrics
+    from src.google_maps_tool.ui.menu import main_menu
+
+    metrics = Metrics()
+    service = create_service("cookies.json", metrics=metrics)
     try:
         main_menu(service)
     except KeyboardInterrupt:
         print("\nExiting...")
         sys.exit(0)
+    finally:
+        if METRICS_FILE:
+            metrics.dump(METRICS_FILE)
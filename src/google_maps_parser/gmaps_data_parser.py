@@ -1,5 +1,6 @@
 import re
 
+from src.google_maps_parser import pb_decoder
 
 # Based on https://github.com/richardDobron/google-maps-data-parameter-parser
 
@@ -13,6 +14,11 @@ class GoogleMapsDataParser:
         messages = [t for t in protocol_buffer.split('!') if t]
         return GoogleMapsDataParser.parse(messages)
 
+    @staticmethod
+    def decode_single_pass(protocol_buffer: str) -> dict:
+        """Same result as `decode`, but without regexes or sub-list copies. Much faster on long strings."""
+        return pb_decoder.decode(protocol_buffer)
+
     @staticmethod
     def encode(messages: dict) -> str:
         return '!' + GoogleMapsDataParser._encode_impl(messages)
@@ -0,0 +1,43 @@
+import re
+
+from src.google_maps_parser.gmaps_data_parser import GoogleMapsDataParser
+
+_SLOT_MARKER = '\x00'
+_SLOT_PATTERN = re.compile(f'{_SLOT_MARKER}([^{_SLOT_MARKER}]+){_SLOT_MARKER}')
+
+
+def slot(name: str, type: str = '') -> str:
+    """
+    Placeholder for a dynamic value inside a template message, e.g. `slot('lat', 'd')` for a double.
+    The value passed to `PbTemplate.render` is inserted right after the `type` letter.
+    """
+    return f'{type}{_SLOT_MARKER}{name}{_SLOT_MARKER}'
+
+
+class PbTemplate:
+    """
+    A message whose static parts are encoded once. Rendering only joins them with the slot values,
+    so the result is the same as `GoogleMapsDataParser.encode` on the filled-in message, at a fraction of the cost.
+    Slots must be scalar values, so that they don't change the element counts of the enclosing messages.
+    """
+
+    def __init__(self, messages: dict):
+        self.messages = messages
+        # Even positions are static text, odd positions are slot names
+        self._parts = _SLOT_PATTERN.split(GoogleMapsDataParser.encode(messages))
+        self.slots = frozenset(self._parts[1::2])
+
+    def render(self, **values) -> str:
+        parts = self._parts[:]
+        for idx in range(1, len(parts), 2):
+            parts[idx] = str(values[parts[idx]])
+        return ''.join(parts)
+
+    def to_dict(self, **values) -> dict:
+        """The message with its slots filled in, as `GoogleMapsDataParser.encode` expects it."""
+        def fill(messages: dict) -> dict:
+            return {key: fill(value) if isinstance(value, dict)
+                    else _SLOT_PATTERN.sub(lambda m: str(values[m.group(1)]), value)
+                    for key, value in messages.items()}
+
+        return fill(self.messages)
@@ -2,11 +2,16 @@
 gmaps_tool package
 Unofficial CLI for managing Google Maps saved places.
 """
+import importlib
 
-from .models.coord import GMCoord
-from .models.list import GMList
-from .models.place import GMPlace, GMPlaceDetails
-from .service.maps_service import GoogleMapsService
+# Loaded on first access, so that importing a submodule (e.g. the CLI) doesn't import the whole service
+_EXPORTS = {
+    "GMPlace": ".models.place",
+    "GMPlaceDetails": ".models.place",
+    "GMList": ".models.list",
+    "GMCoord": ".models.coord",
+    "GoogleMapsService": ".service.maps_service",
+}
 
 __all__ = [
     "GMPlace",
@@ -15,3 +20,16 @@ __all__ = [
     "GMCoord",
     "GoogleMapsService",
 ]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
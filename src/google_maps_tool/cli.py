@@ -0,0 +1,328 @@
+"""
+Non-interactive commands for scripts and cron jobs. Results are printed to stdout as JSON,
+progress and errors go to stderr.
+
+    python main.py lists
+    python main.py places "Want to go"
+    python main.py sort --src "Want to go" --dst "Bucharest" --preset Bucharest --dry-run
+    python main.py sort-all-presets --src "Want to go"
+    python main.py details "Bucharest" --limit 20
+    python main.py export --output places.parquet --details
+
+Exit codes: 0 on success, 1 if some places could not be added (or their details loaded), 2 for bad arguments
+(including unknown lists and presets), 3 if the service could not be reached or sent an error instead of data.
+
+The service and the modules only some commands need are imported when the command runs, and the cookies are
+only read before the first request, so that `--help`, bad arguments and cached answers return quickly
+(`python -m benchmarks.bench_import` keeps track of it).
+"""
+import argparse
+import json
+import sys
+from typing import TYPE_CHECKING
+
+from src.google_maps_tool.config.config import load_cookies, load_location_presets
+from src.google_maps_tool.service.export import (DEFAULT_DETAILS_REQUESTS_PER_SECOND, DEFAULT_DETAILS_WORKERS, FORMATS,
+                                                  export_places, open_place_writer, place_record)
+from src.google_maps_tool.service.metrics import Metrics
+
+if TYPE_CHECKING:
+    from src.google_maps_tool.models.list import GMList
+    from src.google_maps_tool.service.maps_service import GoogleMapsService
+
+EXIT_OK = 0
+EXIT_INCOMPLETE = 1
+EXIT_USAGE = 2
+EXIT_SERVICE_ERROR = 3
+
+
+class UsageError(Exception):
+    """Arguments that parse, but don't match the account, e.g. an unknown list."""
+
+
+def create_service(cookies_path: str = "cookies.json", base_url: str | None = None,
+                   metrics: Metrics | None = None, workers: int | None = None) -> 'GoogleMapsService':
+    """
+    The service as set up for the menu: pooled session, stored tokens, snapshot and details caches.
+    `workers` is the most threads a command sends requests from at once, the pool keeps a connection for each.
+    """
+    from src.google_maps_tool.service.cache import DetailsCache, SnapshotCache
+    from src.google_maps_tool.service.context import GoogleMapsContext, TokenStore
+    from src.google_maps_tool.service.maps_service import GoogleMapsService
+    from src.google_maps_tool.service.transport import TransportConfig, create_session, pool_size_for
+
+    transport = TransportConfig(pool_size=pool_size_for(workers)) if workers else TransportConfig()
+    context = GoogleMapsContext(session_factory=lambda: create_session(_load_cookies(cookies_path), transport),
+                                token_store=TokenStore("gmaps_tokens.json"), transport=transport,
+                                base_url=base_url, metrics=metrics)
+    return GoogleMapsService(context,
+                             cache=SnapshotCache("gmaps_cache.sqlite3", ttl_seconds=6 * 60 * 60),
+                             details_cache=DetailsCache("gmaps_cache.sqlite3", ttl_seconds=7 * 24 * 60 * 60,
+                                                        max_entries=5000))
+
+
+def find_list(gmlists: list['GMList'], key: str) -> 'GMList':
+    """A list by id, or by name (case-insensitive)."""
+    for gmlist in gmlists:
+        if gmlist.id == key:
+            return gmlist
+
+    matches = [gmlist for gmlist in gmlists if gmlist.name.strip().lower() == key.strip().lower()]
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        raise UsageError(f'Several lists are named `{key}`, use the id instead: '
+                         f'{", ".join(gmlist.id for gmlist in matches)}')
+    raise UsageError(f'No list with the id or name `{key}`')
+
+
+def find_preset(presets: dict[str, dict], key: str) -> str:
+    """Name of a location preset, matched case-insensitively like list names."""
+    if key in presets:
+        return key
+
+    matches = [name for name in presets if name.strip().lower() == key.strip().lower()]
+    if len(matches) == 1:
+        return matches[0]
+    raise UsageError(f'No location preset named `{key}`, known presets: {", ".join(presets)}')
+
+
+def _load_cookies(path: str):
+    try:
+        return load_cookies(path)
+    except (OSError, ValueError) as e:
+        raise UsageError(f'Could not load the cookies from {path} → {e}')
+
+
+def _service_errors() -> tuple[type[Exception], ...]:
+    # Only evaluated once a command failed, so that the CLI doesn't import the service up front
+    from src.google_maps_tool.service.context import ServiceError
+    return ServiceError, json.JSONDecodeError
+
+
+def _load_presets(path: str) -> dict[str, dict]:
+    try:
+        return load_location_presets(path)
+    except (OSError, ValueError) as e:
+        raise UsageError(f'Could not load the location presets from {path} → {e}')
+
+
+def list_record(gmlist: 'GMList') -> dict:
+    return {'id': gmlist.id, 'name': gmlist.name, 'places_count': gmlist.places_count}
+
+
+def cmd_lists(service: 'GoogleMapsService', args) -> tuple[object, int]:
+    return [list_record(gmlist) for gmlist in service.get_all_lists(use_cache=not args.no_cache)], EXIT_OK
+
+
+def cmd_places(service: 'GoogleMapsService', args) -> tuple[object, int]:
+    gmlist = find_list(service.get_all_lists(use_cache=not args.no_cache), args.list)
+    places = service.get_all_places(gmlist, use_cache=not args.no_cache)
+    return {'list': list_record(gmlist), 'places': [place_record(place) for place in places]}, EXIT_OK
+
+
+def cmd_details(service: 'GoogleMapsService', args) -> tuple[object, int]:
+    gmlist = find_list(service.get_all_lists(use_cache=not args.no_cache), args.list)
+    places = service.get_all_places(gmlist, use_cache=not args.no_cache)[:args.limit]
+
+    records, failed = [], 0
+    for idx, place in enumerate(places, start=1):
+        try:
+            details = service.load_place_details(place, use_cache=not args.no_cache)
+        except Exception as e:
+            print(f'Failed to load the details of {place.name} → {e}', file=sys.stderr)
+            records.append(place_record(place))
+            failed += 1
+            continue
+
+        records.append(place_record(place, details))
+        print(f'\r{idx}/{len(places)} details loaded', end='', file=sys.stderr)
+    print(file=sys.stderr)
+
+    return {'list': list_record(gmlist), 'places': records}, EXIT_INCOMPLETE if failed else EXIT_OK
+
+
+def _area(args, presets: dict[str, dict] | None) -> tuple[float, float, float]:
+    if args.preset:
+        preset = presets[find_preset(presets, args.preset)]
+        return preset['lat'], preset['lon'], args.radius if args.radius is not None else preset['radius_km']
+
+    if args.center is None or args.radius is None:
+        raise UsageError('Give either --preset, or --center and --radius')
+    return args.center[0], args.center[1], args.radius
+
+
+def cmd_sort(service: 'GoogleMapsService', args) -> tuple[object, int]:
+    presets = _load_presets(args.locations) if args.preset else None
+    center_lat, center_lon, radius_km = _area(args, presets)
+
+    lists = service.get_all_lists(use_cache=not args.no_cache)
+    src_list, dst_list = find_list(lists, args.src), find_list(lists, args.dst)
+
+    src_list.refresh()
+    dst_list.refresh()
+    inside = src_list.filter_by_radius(center_lat, center_lon, radius_km)
+    to_add = dst_list.missing_from(inside)
+
+    output = {'source': list_record(src_list), 'destination': list_record(dst_list),
+              'center': [center_lat, center_lon], 'radius_km': radius_km, 'dry_run': args.dry_run,
+              'inside': len(inside), 'to_add': [place_record(place) for place in to_add]}
+    if args.dry_run or not to_add:
+        return output, EXIT_OK
+
+    from src.google_maps_tool.service.verification import add_places_verified
+
+    report = add_places_verified(service, to_add, dst_list)
+    errors = {result.place: result.error for result in report.results}
+    output.update({'added': len(report.verified), 'retried': report.retried,
+                   'missing': [dict(place_record(place), error=errors.get(place)) for place in report.missing]})
+    return output, EXIT_INCOMPLETE if report.missing else EXIT_OK
+
+
+def cmd_sort_all_presets(service: 'GoogleMapsService', args) -> tuple[object, int]:
+    from src.google_maps_tool.service.sorting import execute_preset_sort, find_destination_lists, plan_preset_sort
+
+    presets = _load_presets(args.locations)
+    lists = service.get_all_lists(use_cache=not args.no_cache)
+    src_list = find_list(lists, args.src)
+
+    # Presets go to the list of the same name, unless mapped with --dst
+    destinations = find_destination_lists(lists, presets)
+    for mapping in args.dst or []:
+        name, _, key = mapping.partition('=')
+        if not key:
+            raise UsageError(f'--dst expects PRESET=LIST, got `{mapping}`')
+        destinations[find_preset(presets, name)] = find_list(lists, key)
+    destinations = {name: destinations[name] for name in presets if name in destinations}
+
+    src_list.refresh()
+    plans = plan_preset_sort(src_list, destinations, presets, args.nearest_only)
+
+    output = {'source': list_record(src_list), 'dry_run': args.dry_run,
+              'skipped_presets': [name for name in presets if name not in destinations],
+              'presets': [{'preset': plan.preset, 'destination': list_record(plan.destination),
+                           'inside': len(plan.matches), 'to_add': [place_record(place) for place in plan.to_add]}
+                          for plan in plans]}
+    if args.dry_run:
+        return output, EXIT_OK
+
+    failed = 0
+    for entry, sort_result in zip(output['presets'], execute_preset_sort(service, plans)):
+        entry['added'] = len(sort_result.added)
+        entry['failed'] = [dict(place_record(result.place), error=result.error) for result in sort_result.failed]
+        failed += len(sort_result.failed)
+    return output, EXIT_INCOMPLETE if failed else EXIT_OK
+
+
+def cmd_export(service: 'GoogleMapsService', args) -> tuple[object, int]:
+    lists = service.get_all_lists(use_cache=not args.no_cache)
+    gmlists = [find_list(lists, key) for key in args.lists] if args.lists else lists
+
+    try:
+        writer = open_place_writer(args.output, args.format, with_details=args.details)
+    except (OSError, ValueError, RuntimeError) as e:
+        raise UsageError(str(e))
+
+    exported = 0
+
+    def on_record(record: dict) -> None:
+        nonlocal exported
+        exported += 1
+        if exported % 100 == 0:
+            print(f'\r{exported} places exported', end='', file=sys.stderr)
+
+    with writer:
+        report = export_places(service, gmlists, writer, with_details=args.details,
+                               details_workers=args.workers, requests_per_second=args.requests_per_second,
+                               use_cache=not args.no_cache, on_record=on_record)
+    print(file=sys.stderr)
+
+    output = {'output': args.output, 'lists': [list_record(gmlist) for gmlist in gmlists],
+              'places': report.places, 'details_failed': report.details_failed}
+    return output, EXIT_INCOMPLETE if report.details_failed else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='main.py', description='Manage Google Maps saved places from scripts. '
+                                                                  'Run without arguments for the interactive menu.')
+    parser.add_argument('--cookies', default='cookies.json', help='{name: value} JSON of the Google cookies')
+    parser.add_argument('--locations', default='locations.json', help='location presets')
+    parser.add_argument('--base-url', help='send the requests to this host instead, e.g. the stand-in server')
+    parser.add_argument('--no-cache', action='store_true', help='download lists, places and details again')
+    parser.add_argument('--indent', type=int, default=None, help='pretty-print the JSON output')
+    parser.add_argument('--metrics-out', help='write the request and cache stats to this JSON file')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('lists', help='all lists with their number of places')
+
+    places = commands.add_parser('places', help='places of a list')
+    places.add_argument('list', help='id or name of the list')
+
+    details = commands.add_parser('details', help='places of a list with their details')
+    details.add_argument('list', help='id or name of the list')
+    details.add_argument('--limit', type=int, default=None, help='only the first N places')
+
+    sort = commands.add_parser('sort', help='add the places of SRC inside an area to DST')
+    sort.add_argument('--src', required=True, help='id or name of the source list')
+    sort.add_argument('--dst', required=True, help='id or name of the destination list')
+    sort.add_argument('--preset', help='location preset to use as the area')
+    sort.add_argument('--center', type=float, nargs=2, metavar=('LAT', 'LON'))
+    sort.add_argument('--radius', type=float, help='km, overrides the radius of --preset')
+    sort.add_argument('--dry-run', action='store_true', help='only print the places that would be added')
+
+    sort_all = commands.add_parser('sort-all-presets', help='sort SRC into the list of every location preset')
+    sort_all.add_argument('--src', required=True, help='id or name of the source list')
+    sort_all.add_argument('--dst', action='append', metavar='PRESET=LIST',
+                          help='destination of a preset, by default the list named like the preset')
+    sort_all.add_argument('--nearest-only', action='store_true', help='add each place only to its nearest preset')
+    sort_all.add_argument('--dry-run', action='store_true', help='only print the places that would be added')
+
+    export = commands.add_parser('export', help='stream the places of some or all lists to a file')
+    export.add_argument('lists', nargs='*', help='ids or names of the lists, all lists if none')
+    export.add_argument('--output', '-o', required=True,
+                        help='file to write, `-` for stdout (the summary then goes to stderr)')
+    export.add_argument('--format', choices=FORMATS, help='by default from the extension of --output')
+    export.add_argument('--details', action='store_true', help='add address, rating, hours, website and category')
+    export.add_argument('--workers', type=int, default=DEFAULT_DETAILS_WORKERS, help='threads loading the details')
+    export.add_argument('--requests-per-second', type=float, default=DEFAULT_DETAILS_REQUESTS_PER_SECOND,
+                        help='details requests allowed per second, cached details are not counted')
+
+    return parser
+
+
+HANDLERS = {
+    'lists': cmd_lists,
+    'places': cmd_places,
+    'details': cmd_details,
+    'sort': cmd_sort,
+    'sort-all-presets': cmd_sort_all_presets,
+    'export': cmd_export,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics = Metrics()
+
+    try:
+        service = create_service(args.cookies, args.base_url, metrics, workers=getattr(args, 'workers', None))
+        output, exit_code = HANDLERS[args.command](service, args)
+    except UsageError as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return EXIT_USAGE
+    except _service_errors() as e:
+        print(f'Service error: {e}', file=sys.stderr)
+        return EXIT_SERVICE_ERROR
+    finally:
+        if args.metrics_out:
+            metrics.dump(args.metrics_out)
+
+    # Exported to stdout, the summary goes next to the progress
+    out = sys.stderr if getattr(args, 'output', None) == '-' else sys.stdout
+    json.dump(output, out, indent=args.indent, ensure_ascii=False)
+    out.write('\n')
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,8 @@
 import json
+from typing import TYPE_CHECKING
 
-from requests.cookies import RequestsCookieJar
+if TYPE_CHECKING:
+    from requests.cookies import RequestsCookieJar
 
 
 def load_location_presets(filename="locations.json"):
@@ -8,10 +10,17 @@ def load_location_presets(filename="locations.json"):
         return json.load(f)
 
 
-def load_cookies(filename="cookies.json") -> RequestsCookieJar:
-    """Load cookies from a simple {name: value} JSON into Requests session."""
+def load_cookie_dict(filename="cookies.json") -> dict[str, str]:
+    """Load cookies from a simple {name: value} JSON."""
     with open(filename, "r", encoding="utf-8") as f:
-        cookie_dict = json.load(f)
+        return json.load(f)
+
+
+def load_cookies(filename="cookies.json") -> 'RequestsCookieJar':
+    """Load cookies from a simple {name: value} JSON into Requests session."""
+    from requests.cookies import RequestsCookieJar
+
+    cookie_dict = load_cookie_dict(filename)
 
     jar = RequestsCookieJar()
     for name, value in cookie_dict.items():
@@ -1,10 +1,14 @@
 import os
 from math import radians, sin, cos, sqrt, atan2
 
+EARTH_RADIUS_KM = 6371.0
+# Coords-only places are told apart by their coords to this many decimals (about 1 m), and their name
+PLACE_COORD_DECIMALS = 5
+
 
 # --- Distance helper (Haversine) ---
 def haversine(lat1, lon1, lat2, lon2):
-    R = 6371.0  # km
+    R = EARTH_RADIUS_KM
     dlat = radians(lat2 - lat1)
     dlon = radians(lon2 - lon1)
     a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
@@ -16,6 +20,13 @@ def to_uint64(i) -> int:
     return i & 0xFFFFFFFFFFFFFFFF
 
 
+def place_identity(lat, long, name, secret_1, secret_2) -> tuple:
+    """Identity of a place: its secrets, or its coords rounded to `PLACE_COORD_DECIMALS` plus name if it has none."""
+    if secret_1 and secret_2:
+        return to_uint64(secret_1), to_uint64(secret_2)
+    return round(lat, PLACE_COORD_DECIMALS), round(long, PLACE_COORD_DECIMALS), name
+
+
 def decimal_to_dms(lat, lon):
     def to_dms(value, is_lat=True):
         degrees = int(abs(value))
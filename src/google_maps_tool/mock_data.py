@@ -1,2 +1,7 @@
-mock_get_all_lists_response = r""""""
-mock_get_list_response = r""""""
+# Responses recorded from the stand-in server (`standin_server.py`)
+mock_get_all_lists_response = r""")]}'
+[null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,[null,null,null,[[["standin-list-0"],null,null,null,"Want to go",null,null,null,null,null,null,null,3],[["standin-list-1"],null,null,null,"Favorite places",null,null,null,null,null,null,null,5],[["standin-list-2"],null,null,null,"Paris",null,null,null,null,null,null,null,0]]]]"""
+mock_get_list_response = r""")]}'
+[[["standin-list-1"],null,null,null,"Favorite places",null,null,null,[[null,[null,null,"Str. Café 1-0",null,"Str. Café 1-0, 58.63N 18.38E",[null,null,58.6336922,18.3781662],["8258772313671944433","1422298344689381617"]],"Café 1-0","",null,null,null,null,[null,["8258772313671944433","1422298344689381617"]]],[null,[null,null,"Str. Hotel 1-1",null,"Str. Hotel 1-1, 35.29N 0.05E",[null,null,35.2893221,-0.0513179],["6612575953900115774","-3881023613069443411"]],"Hotel 1-1","",null,null,null,null,[null,["6612575953900115774","-3881023613069443411"]]],[null,[null,null,"Str. Hotel 1-2",null,"Str. Hotel 1-2, 37.75N 4.70E",[null,null,37.7506322,-4.6993493],["1111550559870560824","3357357195551156271"]],"Hotel 1-2","",null,null,null,null,[null,["1111550559870560824","3357357195551156271"]]],[null,[null,null,"Str. Museum 1-3",null,"Str. Museum 1-3, 36.68N 15.70E",[null,null,36.6794485,15.7041976],["-2353849872213847867","880729881081624018"]],"Museum 1-3","",null,null,null,null,[null,["-2353849872213847867","880729881081624018"]]],[null,[null,null,"Str. Café 1-4",null,"Str. Café 1-4, 48.67N 17.86E",[null,null,48.6735756,17.8554317],null],"Café 1-4","",null,null,null,null,[null,null]]],null,null,null,5]]"""
+mock_get_place_details_response = r""")]}'
+[null,null,null,null,null,null,[null,null,["Str. Café 1-0","58.63N 18.38E"],null,[null,null,"$$$",null,null,null,null,3.9,3004],null,null,[null,"https://example.com/café-1-0"],null,null,null,"Café 1-0",null,["Café"],null,null,null,null,null,null,null,null,null,null,null,[null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,[[[null,"Favorite places"]]]],null,null,null,null,null,null,null,null,[null,[["Monday",["9 AM–6 PM"]],["Tuesday",["9 AM–6 PM"]],["Wednesday",["9 AM–6 PM"]],["Thursday",["9 AM–6 PM"]],["Friday",["9 AM–6 PM"]]]],null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,null,[["+40 752979844"]],null,null,null,null,[null,null,[null,null,["8GQ7261+55"]]]]]"""
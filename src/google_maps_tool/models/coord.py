@@ -1,9 +1,9 @@
-import math
-
-from src.google_maps_tool.helpers import decimal_to_dms
+from src.google_maps_tool.helpers import decimal_to_dms, haversine
 
 
 class GMCoord:
+    __slots__ = ('lat', 'long')
+
     def __init__(self, lat, long):
         self.lat = lat
         self.long = long
@@ -13,18 +13,7 @@ class GMCoord:
         Calculate distance in km between this coordinate and another (lat, lon).
         Uses the haversine formula.
         """
-        R = 6371.0  # Earth radius in km
-
-        lat1, lon1 = math.radians(self.lat), math.radians(self.long)
-        lat2, lon2 = math.radians(lat), math.radians(long)
-
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-
-        a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-        return R * c
+        return haversine(self.lat, self.long, lat, long)
 
     def __repr__(self):
         return f'[GMCoord] {str(self)}'
@@ -0,0 +1,84 @@
+import math
+from array import array
+from typing import Iterable, Sequence
+
+from src.google_maps_tool.helpers import EARTH_RADIUS_KM, haversine
+
+# Set by `load_numpy`: NumPy takes a while to import, so it is only loaded once coords are first needed
+np = None
+_numpy_loaded = False
+
+
+def load_numpy():
+    """The numpy module, or None if it is not installed (NumPy is optional, the fallback is plain Python loops)."""
+    global np, _numpy_loaded
+    if not _numpy_loaded:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+        _numpy_loaded = True
+    return np
+
+
+class CoordArray:
+    """
+    The coords of many places, stored as two contiguous float64 columns.
+    Distances are computed for all of them at once with NumPy when it is installed (or `use_numpy` is True),
+    otherwise with the scalar `haversine`. Both paths use the same formula.
+    """
+
+    def __init__(self, lats: Iterable[float], lons: Iterable[float], use_numpy: bool | None = None):
+        load_numpy()
+        if use_numpy is None:
+            use_numpy = np is not None
+        elif use_numpy and np is None:
+            raise RuntimeError('NumPy is not installed')
+
+        self.use_numpy = use_numpy
+        if use_numpy:
+            self.lats = np.fromiter(lats, dtype=np.float64)
+            self.lons = np.fromiter(lons, dtype=np.float64)
+            self._cos_lats = np.cos(np.radians(self.lats))
+        else:
+            self.lats = array('d', lats)
+            self.lons = array('d', lons)
+
+        if len(self.lats) != len(self.lons):
+            raise ValueError('lats and lons must have the same length')
+
+    @classmethod
+    def from_places(cls, places: Sequence['GMPlace'], use_numpy: bool | None = None) -> 'CoordArray':
+        return cls((place.coord.lat for place in places), (place.coord.long for place in places), use_numpy)
+
+    def __len__(self):
+        return len(self.lats)
+
+    def distances_to(self, lat: float, lon: float) -> Sequence[float]:
+        """Distance in km from every coord to (lat, lon)."""
+        if not self.use_numpy:
+            return [haversine(p_lat, p_lon, lat, lon) for p_lat, p_lon in zip(self.lats, self.lons)]
+
+        return self._haversine(np.float64(lat), np.float64(lon), math.cos(math.radians(lat)))
+
+    def distance_matrix(self, centers: Sequence[tuple[float, float]]) -> Sequence[Sequence[float]]:
+        """Distances in km with one row per coord and one column per (lat, lon) center."""
+        if not self.use_numpy:
+            return [[haversine(p_lat, p_lon, c_lat, c_lon) for c_lat, c_lon in centers]
+                    for p_lat, p_lon in zip(self.lats, self.lons)]
+
+        center_lats = np.array([c[0] for c in centers], dtype=np.float64)
+        center_lons = np.array([c[1] for c in centers], dtype=np.float64)
+        # Broadcast (n, 1) coords against (m,) centers
+        return self._haversine(center_lats, center_lons, np.cos(np.radians(center_lats)), column=True)
+
+    def _haversine(self, lat, lon, cos_lat, column=False):
+        lats, lons, cos_lats = self.lats, self.lons, self._cos_lats
+        if column:
+            lats, lons, cos_lats = lats[:, None], lons[:, None], cos_lats[:, None]
+
+        dlat = np.radians(lat - lats)
+        dlon = np.radians(lon - lons)
+        a = np.sin(dlat / 2) ** 2 + cos_lats * cos_lat * np.sin(dlon / 2) ** 2
+        return EARTH_RADIUS_KM * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
@@ -1,6 +1,14 @@
 from enum import Enum
+from typing import Iterable, Iterator, Sequence
 
+from src.google_maps_tool.models.coord_array import CoordArray
 from src.google_maps_tool.models.place import GMPlace
+from src.google_maps_tool.models.place_table import PlaceTable
+from src.google_maps_tool.models.spatial_index import GridIndex
+
+
+# Lists with at least this many places keep them in a `PlaceTable`, see `GMList.compact`
+COMPACT_MIN_PLACES = 2_000
 
 
 class GMListType(Enum):
@@ -19,7 +27,10 @@ class GMList:
         self.index = index
         self.places_count = places_count
         self.type = self._get_list_type()
-        self._places: list[GMPlace] | None = None
+        self._places: list[GMPlace] | PlaceTable | None = None
+        self._compact = False
+        self._spatial_index: GridIndex | None = None
+        self._coord_array: CoordArray | None = None
         self._service = service
 
     @classmethod
@@ -31,21 +42,127 @@ class GMList:
         return cls(id, name, places_count, index, service)
 
     @property
-    def places(self) -> list[GMPlace]:
+    def places(self) -> Sequence[GMPlace]:
         if self._places is None:
-            self.refresh()
+            self._load()
         return self._places
 
+    def iter_places(self) -> Iterator[GMPlace]:
+        """
+        Yield the places, streaming them page by page from the service the first time,
+        so callers can start working before the whole list has arrived.
+        """
+        if self._places is not None:
+            yield from self._places
+            return
+
+        loaded = self._new_places()
+        for place in self._service.iter_places(self):
+            loaded.append(place)
+            yield place
+
+        self._places = loaded
+        self._invalidate_indexes()
+
     def refresh(self):
-        """Force reload from service."""
-        self._places = self._service.get_all_places(self)
+        """Force reload from service, bypassing any cached snapshot."""
+        self._load(use_cache=False)
+
+    def record_added_place(self, gmplace: GMPlace) -> None:
+        """Reflect a place added on the server without reloading: bump the count and append it if loaded."""
+        self.places_count += 1
+        if self._places is not None:
+            self._places.append(gmplace)
+            self._invalidate_indexes()
+
+    def compact(self) -> None:
+        """
+        Keep the places in a columnar `PlaceTable` from now on, which takes much less memory for big lists.
+        `places` then hands out lightweight `GMPlace` views, created on access.
+        Lists of `COMPACT_MIN_PLACES` or more are loaded this way without asking.
+        """
+        self._compact = True
+        if self._places is not None and not isinstance(self._places, PlaceTable):
+            self._places = PlaceTable.from_places(self._places, self._service)
+
+    def set_places(self, places: Iterable[GMPlace]) -> None:
+        """Replace the places, e.g. with the ones fetched asynchronously, and drop the indexes built on the old ones."""
+        loaded = self._new_places()
+        loaded.extend(places)
+        self._places = loaded
+        self._invalidate_indexes()
+
+    def _load(self, use_cache=True) -> None:
+        self.set_places(self._service.get_all_places(self, use_cache=use_cache))
+
+    def _new_places(self) -> list[GMPlace] | PlaceTable:
+        if self._compact or self.places_count >= COMPACT_MIN_PLACES:
+            return PlaceTable(self._service)
+        return []
+
+    @property
+    def spatial_index(self) -> GridIndex:
+        """Grid index over the coords of the places, built on first use."""
+        if self._spatial_index is None:
+            places = self.places
+            if isinstance(places, PlaceTable):
+                self._spatial_index = GridIndex(list(zip(places.lats, places.lons)))
+            else:
+                self._spatial_index = GridIndex([(place.coord.lat, place.coord.long) for place in places])
+        return self._spatial_index
+
+    @property
+    def coord_array(self) -> CoordArray:
+        """Coords of the places as contiguous arrays, built on first use."""
+        if self._coord_array is None:
+            places = self.places
+            if isinstance(places, PlaceTable):
+                self._coord_array = CoordArray(places.lats, places.lons)
+            else:
+                self._coord_array = CoordArray.from_places(places)
+        return self._coord_array
+
+    def distances_to(self, lat, lon) -> Sequence[float]:
+        """Distance in km from every place (in list order) to (lat, lon)."""
+        return self.coord_array.distances_to(lat, lon)
+
+    def distance_matrix(self, centers: Sequence[tuple[float, float]]) -> Sequence[Sequence[float]]:
+        """Distances in km with one row per place and one column per (lat, lon) center, e.g. the location presets."""
+        return self.coord_array.distance_matrix(centers)
 
     def filter_by_radius(self, center_lat, center_lon, radius_km) -> list[GMPlace]:
         """Return a list of GMPlace within radius_km of (center_lat, center_lon)."""
-        return [
-            place for place in self.places
-            if place.coord.distance_to(center_lat, center_lon) <= radius_km
-        ]
+        places = self.places
+        return [places[idx] for idx in self.spatial_index.query_radius(center_lat, center_lon, radius_km)]
+
+    def filter_by_bbox(self, min_lat, min_lon, max_lat, max_lon) -> list[GMPlace]:
+        """Return a list of GMPlace inside the box. If min_lon > max_lon, the box crosses the antimeridian."""
+        places = self.places
+        return [places[idx] for idx in self.spatial_index.query_bbox(min_lat, min_lon, max_lat, max_lon)]
+
+    def missing_from(self, other: 'GMList | Iterable[GMPlace]') -> list[GMPlace]:
+        """Return the places of `other` that are not in this list yet, without duplicates, in the order of `other`."""
+        seen = set(self.places)
+        missing = []
+        for place in _places_of(other):
+            if place not in seen:
+                seen.add(place)
+                missing.append(place)
+        return missing
+
+    def intersection(self, other: 'GMList | Iterable[GMPlace]') -> list[GMPlace]:
+        """Return the places of this list that are also in `other`."""
+        others = set(_places_of(other))
+        return [place for place in self.places if place in others]
+
+    def difference(self, other: 'GMList | Iterable[GMPlace]') -> list[GMPlace]:
+        """Return the places of this list that are not in `other`."""
+        others = set(_places_of(other))
+        return [place for place in self.places if place not in others]
+
+    def _invalidate_indexes(self) -> None:
+        self._spatial_index = None
+        self._coord_array = None
 
     def _get_list_type(self) -> GMListType:
         match self.name:
@@ -65,3 +182,7 @@ class GMList:
 
     def __str__(self):
         return f'id: {self.id}, name: {self.name}, index: {self.index}, places: \n{str(self.places)}'
+
+
+def _places_of(other: GMList | Iterable[GMPlace]) -> Iterable[GMPlace]:
+    return other.places if isinstance(other, GMList) else other
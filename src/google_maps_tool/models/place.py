@@ -1,7 +1,9 @@
 import base64
+import functools
 from dataclasses import dataclass
 
-from src.google_maps_tool.helpers import maybe, to_uint64
+from src.google_maps_parser.pb_template import PbTemplate, slot
+from src.google_maps_tool.helpers import maybe, place_identity, to_uint64
 from src.google_maps_tool.models.coord import GMCoord
 
 
@@ -21,18 +23,23 @@ class GMPlaceDetails:
 
     @classmethod
     def from_json(cls, json_data: dict) -> 'GMPlaceDetails':
+        return cls.from_place_json(maybe(json_data, 6))
+
+    @classmethod
+    def from_place_json(cls, place_data: list) -> 'GMPlaceDetails':
+        """Build from the place entry of a details response only, i.e. `json_data[6]`."""
         return cls(
-            short_name=maybe(json_data, 6, 11),
-            _full_address=maybe(json_data, 6, 2),
-            avg_price=maybe(json_data, 6, 4, 2),
-            avg_rating=maybe(json_data, 6, 4, 7),
-            review_count=maybe(json_data, 6, 4, 8),
-            website=maybe(json_data, 6, 7, 1),
-            category=maybe(json_data, 6, 13, 0),
-            _saved_in_lists=maybe(json_data, 6, 25, 15),
-            _open_hours=maybe(json_data, 6, 34, 1),
-            phone_number=maybe(json_data, 6, 178, 0, 0),
-            plus_code=maybe(json_data, 6, 183, 2, 2, 0)
+            short_name=maybe(place_data, 11),
+            _full_address=maybe(place_data, 2),
+            avg_price=maybe(place_data, 4, 2),
+            avg_rating=maybe(place_data, 4, 7),
+            review_count=maybe(place_data, 4, 8),
+            website=maybe(place_data, 7, 1),
+            category=maybe(place_data, 13, 0),
+            _saved_in_lists=maybe(place_data, 25, 15),
+            _open_hours=maybe(place_data, 34, 1),
+            phone_number=maybe(place_data, 178, 0, 0),
+            plus_code=maybe(place_data, 183, 2, 2, 0)
         )
 
     @property
@@ -57,7 +64,258 @@ class GMPlaceDetails:
         return [f'{p[0]}: {', '.join(p[1])}' for p in self._open_hours if p]
 
 
+def _details_message(with_secrets: bool) -> dict:
+    message: dict = {
+        '1': {
+            '4': {
+                '3': slot('lat', 'd'),
+                '4': slot('long', 'd')}
+        },
+        '12': {
+            '2': {
+                '1': 'i360',
+                '2': 'i120',
+                '4': 'i8'
+            }
+        },
+        '13': {
+            '2': {
+                '1': 'i203',
+                '2': 'i100'
+            },
+            '3': {
+                '2': 'i4',
+                '5': 'b1'
+            },
+            '6': {
+                '1': {
+                    '1': 'i86',
+                    '2': 'i86'
+                },
+                '1_1': {
+                    '1': 'i408',
+                    '2': 'i240'
+                }
+            },
+            '7': {
+                '1': {'1': 'e1', '2': 'b0', '3': 'e3'},
+                '1_1': {'1': 'e2', '2': 'b1', '3': 'e2'},
+                '1_2': {'1': 'e2', '2': 'b0', '3': 'e3'},
+                '1_3': {'1': 'e8', '2': 'b0', '3': 'e3'},
+                '1_4': {'1': 'e10', '2': 'b0', '3': 'e3'},
+                '1_5': {'1': 'e10', '2': 'b1', '3': 'e2'},
+                '1_6': {'1': 'e10', '2': 'b0', '3': 'e4'},
+                '1_7': {'1': 'e9', '2': 'b1', '3': 'e2'},
+                '2': 'b1'
+            },
+            '9': 'b0',
+            '15': {
+                '1': {
+                    '1': {
+                        '1': {'1': 'e2'}
+                    },
+                    '2': {'1': 'i195', '2': 'i195'},
+                    '3': 'i20'
+                }
+            }
+        },
+        '14': {
+            '1': slot('session_id', 's'), '7': 'e81'
+        },
+        '15': {
+            '1': {
+                '4': 'e2',
+                '13': {
+                    '2': 'b1',
+                    '3': 'b1',
+                    '4': 'b1',
+                    '6': 'i1',
+                    '8': 'b1',
+                    '9': 'b1',
+                    '14': 'b1',
+                    '20': 'b1',
+                    '25': 'b1'
+                },
+                '18': {
+                    '3': 'b1',
+                    '4': 'b1',
+                    '5': 'b1',
+                    '6': 'b1',
+                    '9': 'b1',
+                    '12': 'b1',
+                    '13': 'b1',
+                    '14': 'b1',
+                    '17': 'b1',
+                    '20': 'b1',
+                    '21': 'b1',
+                    '22': 'b1',
+                    '25': 'b1',
+                    '27': {'1': 'b0'},
+                    '28': 'b0',
+                    '30': 'b1',
+                    '32': 'b1',
+                    '33': {'1': 'b1'},
+                    '34': 'b1',
+                    '36': 'e2'
+                }
+            },
+            '10': {'8': 'e3'},
+            '11': {'3': 'e1'},
+            '14': {'3': 'b0'},
+            '17': 'b1',
+            '20': {'1': 'e3', '1_1': 'e6'},
+            '24': 'b1',
+            '25': 'b1',
+            '26': 'b1',
+            '27': 'b1',
+            '29': 'b1',
+            '30': {'2': 'b1'},
+            '36': 'b1',
+            '37': 'b1',
+            '39': {
+                '2': {'2': 'i1', '3': 'i1'}
+            },
+            '43': 'b1',
+            '52': 'b1',
+            '54': {'1': 'b1'},
+            '55': 'b1',
+            '56': {'1': 'b1'},
+            '61': {
+                '1': {'1': 'e1'}
+            },
+            '65': {
+                '3': {
+                    '1': {
+                        '1': {'1': 'i224', '2': 'i298'}
+                    }
+                }
+            },
+            '72': {
+                '1': {
+                    '2': 'b1',
+                    '5': 'b1',
+                    '7': 'b1',
+                    '12': {
+                        '1': 'b1',
+                        '2': 'b1',
+                        '4': {'1': 'e1'}
+                    }
+                },
+                '4': 'b1',
+                '8': {
+                    '1': {
+                        '4': {'1': 'e1'},
+                        '4_1': {'1': 'e3'},
+                        '4_2': {'1': 'e4'}
+                    },
+                    '3': 'sother_user_google_review_posts__and__hotel_and_vr_partner_review_posts',
+                    '6': {'1': 'e1'}
+                },
+                '9': 'b1'
+            },
+            '89': 'b1',
+            '98': {'1': 'b1', '2': 'b1', '3': 'b1'},
+            '103': 'b1',
+            '113': 'b1',
+            '114': {
+                '1': 'b1', '2': {
+                    '1': 'b1'
+                }
+            },
+            '117': 'b1',
+            '122': {'1': 'b1'},
+            '125': 'b0',
+            '126': 'b1',
+            '127': 'b1'
+        },
+        '21': {},
+        '22': {'1': 'e81'},
+        '29': {},
+        '30': {'3': 'b1', '6': {'2': 'b1'}, '7': {'2': 'b1'}, '9': 'b1'},
+        '34': {'7': 'b1', '10': 'b1', '14': 'b1', '15': {'1': 'b0'}},
+        '39': slot('name', 's')
+    }
+
+    if with_secrets:
+        message['1'] = {
+            '1': slot('secrets', 's'),
+            '4': {
+                '3': slot('lat', 'd'),
+                '4': slot('long', 'd')}
+        }
+        message['12']['2']['1'] = 'i360'
+    else:
+        message['12']['2']['1'] = 'i272'
+
+    return message
+
+
+def _add_message(with_secrets: bool) -> dict:
+    message: dict = {
+        '1': {
+            '1': slot('list_id', 's'),
+            '2': 'e1',
+            '3': {
+                '1': 'e1'
+            }
+        },
+        '2': {
+            '2': {
+                '6': {
+                    '3': slot('lat', 'd'),
+                    '4': slot('long', 'd')
+                }
+            },
+            '9': {
+                '1': {
+                    '1': 'e1'
+                },
+            }
+        },
+        '3': {
+            '1': slot('session_id', 's'),
+            '2': slot('list_position', 's'),
+            '4': {
+                '2': slot('list_type', 'i')
+            },
+            '7': 'e81',
+            '28': 'e2'},
+        '4': slot('service_token', 's')
+    }
+
+    if with_secrets:
+        message['2']['2']['7'] = {
+            '1': slot('secret_1', 'y'),
+            '2': slot('secret_2', 'y')
+        }
+        message['2']['3'] = slot('name', 's')
+        message['2']['9']['2'] = {
+            '1': slot('secret_1', 'y'),
+            '2': slot('secret_2', 'y')
+        }
+    else:
+        message['2']['3'] = slot('name', 'z')
+        message['2']['9']['3'] = {
+            '3': slot('lat', 'd'),
+            '4': slot('long', 'd')
+        }
+
+    return message
+
+
+@functools.cache
+def _details_template(with_secrets: bool) -> PbTemplate:
+    return PbTemplate(_details_message(with_secrets))
+
+
+@functools.cache
+def _add_template(with_secrets: bool) -> PbTemplate:
+    return PbTemplate(_add_message(with_secrets))
+
+
 class GMPlace:
+    __slots__ = ('name', 'coord', 'secret_1', 'secret_2', '_service', '_details')
+
     def __init__(self, name, lat, long, secret_1, secret_2, service: 'GoogleMapsService'):
         self.name = name
         self.coord = GMCoord(lat, long)
@@ -87,252 +345,51 @@ class GMPlace:
             self.load_details()
         return self._details
 
+    @details.setter
+    def details(self, details: GMPlaceDetails) -> None:
+        self._details = details
+
+    @property
+    def has_details(self) -> bool:
+        """Whether the details are loaded, so that reading `details` doesn't send a request."""
+        return self._details is not None
+
     @property
     def is_coords_only(self) -> bool:
         return not (self.secret_1 and self.secret_2)
 
-    def load_details(self) -> None:
-        place_details_json = self._service.get_place_details(self)
-        self._details = GMPlaceDetails.from_json(place_details_json)
-
-    def build_get_details_payload(self, session_id) -> dict:
-        base: dict = {
-            '1': {
-                '4': {
-                    '3': f'd{self.coord.lat}',
-                    '4': f'd{self.coord.long}'}
-            },
-            '12': {
-                '2': {
-                    '1': 'i360',
-                    '2': 'i120',
-                    '4': 'i8'
-                }
-            },
-            '13': {
-                '2': {
-                    '1': 'i203',
-                    '2': 'i100'
-                },
-                '3': {
-                    '2': 'i4',
-                    '5': 'b1'
-                },
-                '6': {
-                    '1': {
-                        '1': 'i86',
-                        '2': 'i86'
-                    },
-                    '1_1': {
-                        '1': 'i408',
-                        '2': 'i240'
-                    }
-                },
-                '7': {
-                    '1': {'1': 'e1', '2': 'b0', '3': 'e3'},
-                    '1_1': {'1': 'e2', '2': 'b1', '3': 'e2'},
-                    '1_2': {'1': 'e2', '2': 'b0', '3': 'e3'},
-                    '1_3': {'1': 'e8', '2': 'b0', '3': 'e3'},
-                    '1_4': {'1': 'e10', '2': 'b0', '3': 'e3'},
-                    '1_5': {'1': 'e10', '2': 'b1', '3': 'e2'},
-                    '1_6': {'1': 'e10', '2': 'b0', '3': 'e4'},
-                    '1_7': {'1': 'e9', '2': 'b1', '3': 'e2'},
-                    '2': 'b1'
-                },
-                '9': 'b0',
-                '15': {
-                    '1': {
-                        '1': {
-                            '1': {'1': 'e2'}
-                        },
-                        '2': {'1': 'i195', '2': 'i195'},
-                        '3': 'i20'
-                    }
-                }
-            },
-            '14': {
-                '1': f's{session_id}', '7': 'e81'
-            },
-            '15': {
-                '1': {
-                    '4': 'e2',
-                    '13': {
-                        '2': 'b1',
-                        '3': 'b1',
-                        '4': 'b1',
-                        '6': 'i1',
-                        '8': 'b1',
-                        '9': 'b1',
-                        '14': 'b1',
-                        '20': 'b1',
-                        '25': 'b1'
-                    },
-                    '18': {
-                        '3': 'b1',
-                        '4': 'b1',
-                        '5': 'b1',
-                        '6': 'b1',
-                        '9': 'b1',
-                        '12': 'b1',
-                        '13': 'b1',
-                        '14': 'b1',
-                        '17': 'b1',
-                        '20': 'b1',
-                        '21': 'b1',
-                        '22': 'b1',
-                        '25': 'b1',
-                        '27': {'1': 'b0'},
-                        '28': 'b0',
-                        '30': 'b1',
-                        '32': 'b1',
-                        '33': {'1': 'b1'},
-                        '34': 'b1',
-                        '36': 'e2'
-                    }
-                },
-                '10': {'8': 'e3'},
-                '11': {'3': 'e1'},
-                '14': {'3': 'b0'},
-                '17': 'b1',
-                '20': {'1': 'e3', '1_1': 'e6'},
-                '24': 'b1',
-                '25': 'b1',
-                '26': 'b1',
-                '27': 'b1',
-                '29': 'b1',
-                '30': {'2': 'b1'},
-                '36': 'b1',
-                '37': 'b1',
-                '39': {
-                    '2': {'2': 'i1', '3': 'i1'}
-                },
-                '43': 'b1',
-                '52': 'b1',
-                '54': {'1': 'b1'},
-                '55': 'b1',
-                '56': {'1': 'b1'},
-                '61': {
-                    '1': {'1': 'e1'}
-                },
-                '65': {
-                    '3': {
-                        '1': {
-                            '1': {'1': 'i224', '2': 'i298'}
-                        }
-                    }
-                },
-                '72': {
-                    '1': {
-                        '2': 'b1',
-                        '5': 'b1',
-                        '7': 'b1',
-                        '12': {
-                            '1': 'b1',
-                            '2': 'b1',
-                            '4': {'1': 'e1'}
-                        }
-                    },
-                    '4': 'b1',
-                    '8': {
-                        '1': {
-                            '4': {'1': 'e1'},
-                            '4_1': {'1': 'e3'},
-                            '4_2': {'1': 'e4'}
-                        },
-                        '3': 'sother_user_google_review_posts__and__hotel_and_vr_partner_review_posts',
-                        '6': {'1': 'e1'}
-                    },
-                    '9': 'b1'
-                },
-                '89': 'b1',
-                '98': {'1': 'b1', '2': 'b1', '3': 'b1'},
-                '103': 'b1',
-                '113': 'b1',
-                '114': {
-                    '1': 'b1', '2': {
-                        '1': 'b1'
-                    }
-                },
-                '117': 'b1',
-                '122': {'1': 'b1'},
-                '125': 'b0',
-                '126': 'b1',
-                '127': 'b1'
-            },
-            '21': {},
-            '22': {'1': 'e81'},
-            '29': {},
-            '30': {'3': 'b1', '6': {'2': 'b1'}, '7': {'2': 'b1'}, '9': 'b1'},
-            '34': {'7': 'b1', '10': 'b1', '14': 'b1', '15': {'1': 'b0'}},
-            '39': f's{self.name.replace(' ', '+')}'
-        }
+    @property
+    def identity_key(self) -> tuple:
+        """Stable identity of the place, see `place_identity`."""
+        return place_identity(self.coord.lat, self.coord.long, self.name, self.secret_1, self.secret_2)
 
-        payload: dict = base
+    def load_details(self, use_cache=True) -> None:
+        self._details = self._service.load_place_details(self, use_cache=use_cache)
 
-        if not self.is_coords_only:
-            payload['1'] = {
-                '1': f's{hex(to_uint64(self.secret_1))}:{hex(to_uint64(self.secret_2))}',
-                '4': {
-                    '3': f'd{self.coord.lat}',
-                    '4': f'd{self.coord.long}'}
-            }
-            payload['12']['2']['1'] = 'i360'
-        else:
-            payload['1'] = {
-                '4': {
-                    '3': f'd{self.coord.lat}',
-                    '4': f'd{self.coord.long}'}
-            }
-            payload['12']['2']['1'] = 'i272'
+    def build_get_details_payload(self, session_id) -> str:
+        """Encoded `pb` parameter of the place details request."""
+        values = {'lat': self.coord.lat,
+                  'long': self.coord.long,
+                  'session_id': session_id,
+                  'name': self.name.replace(' ', '+')}
 
-        return payload
+        if self.is_coords_only:
+            return _details_template(False).render(**values)
 
-    def build_add_payload(self, gmlist: 'GMList', session_id: str, service_token: str) -> dict:
-        base: dict = {
-            '1': {
-                '1': f's{gmlist.id}',
-                '2': 'e1',
-                '3': {
-                    '1': 'e1'
-                }
-            },
-            '2': {
-                '2': {
-                    '6': {
-                        '3': f'd{self.coord.lat}',
-                        '4': f'd{self.coord.long}'
-                    }
-                },
-                '9': {
-                    '1': {
-                        '1': 'e1'
-                    },
-                }
-            },
-            '3': {
-                '1': f's{session_id}:34',
-                '2': f's1i:{gmlist.index + 1},t:{gmlist.type.value},e:{gmlist.index},p:{session_id}:34',
-                '4': {
-                    '2': f'i{gmlist.type.value}'
-                },
-                '7': 'e81',
-                '28': 'e2'},
-            '4': f's{service_token}'
-        }
+        return _details_template(True).render(
+            secrets=f'{hex(to_uint64(self.secret_1))}:{hex(to_uint64(self.secret_2))}', **values)
 
-        payload: dict = base
+    def build_add_payload(self, gmlist: 'GMList', session_id: str, service_token: str) -> str:
+        """Encoded `pb` parameter of the request adding this place to `gmlist`."""
+        values = {'list_id': gmlist.id,
+                  'lat': self.coord.lat,
+                  'long': self.coord.long,
+                  'session_id': f'{session_id}:34',
+                  'list_position': f'1i:{gmlist.index + 1},t:{gmlist.type.value},e:{gmlist.index},p:{session_id}:34',
+                  'list_type': gmlist.type.value,
+                  'service_token': service_token}
 
-        if not self.is_coords_only:
-            payload['2']['2']['7'] = {
-                '1': f'y{str(to_uint64(self.secret_1))}',
-                '2': f'y{str(to_uint64(self.secret_2))}'
-            }
-            payload['2']['3'] = f's{self.name}'
-            payload['2']['9']['2'] = {
-                '1': f'y{str(to_uint64(self.secret_1))}',
-                '2': f'y{str(to_uint64(self.secret_2))}'
-            }
-        else:
+        if self.is_coords_only:
             def encode_name(name: str) -> str:
                 # Convert to UTF-8 bytes
                 utf8_bytes = name.encode('utf-8')
@@ -341,13 +398,12 @@ class GMPlace:
                 # Return as string
                 return encoded.decode('ascii')
 
-            payload['2']['3'] = f'z{encode_name(self.details.short_name)}'
-            payload['2']['9']['3'] = {
-                '3': f'd{self.coord.lat}',
-                '4': f'd{self.coord.long}'
-            }
+            return _add_template(False).render(name=encode_name(self.details.short_name), **values)
 
-        return payload
+        return _add_template(True).render(name=self.name,
+                                          secret_1=to_uint64(self.secret_1),
+                                          secret_2=to_uint64(self.secret_2),
+                                          **values)
 
     def __repr__(self):
         return f'[GMPlace] {str(self)}'
@@ -356,7 +412,10 @@ class GMPlace:
         return f'name: {self.name}, coords: {self.coord}, secret_1: {self.secret_1}, secret_2: {self.secret_2}'
 
     def __eq__(self, other):
-        return (self.name == other.name
-                and self.coord == other.coord
-                and self.secret_1 == other.secret_1
-                and self.secret_2 == other.secret_2)
+        if not isinstance(other, GMPlace):
+            return NotImplemented
+
+        return self.identity_key == other.identity_key
+
+    def __hash__(self):
+        return hash(self.identity_key)
@@ -0,0 +1,112 @@
+from array import array
+from typing import Iterable, Iterator, Sequence, overload
+
+from src.google_maps_tool.helpers import to_uint64
+from src.google_maps_tool.models.place import GMPlace, GMPlaceDetails
+
+_HAS_SECRET_1 = 1
+_HAS_SECRET_2 = 2
+_NEGATIVE_SECRET_1 = 4
+_NEGATIVE_SECRET_2 = 8
+
+
+def _from_uint64(value: int, negative: bool) -> int:
+    return value - (1 << 64) if negative else value
+
+
+class _PlaceView(GMPlace):
+    """A row of a `PlaceTable`. Details loaded onto it are kept by the table, for every later view of the row."""
+    __slots__ = ('_table', '_idx')
+
+    def __init__(self, table: 'PlaceTable', idx: int, name, lat, long, secret_1, secret_2):
+        self._table = table
+        self._idx = idx
+        super().__init__(name, lat, long, secret_1, secret_2, table._service)
+
+    @property
+    def _details(self) -> GMPlaceDetails | None:
+        return self._table.details.get(self._idx)
+
+    @_details.setter
+    def _details(self, details: GMPlaceDetails | None) -> None:
+        # `GMPlace.__init__` starts without details, which mustn't drop the ones the table already has
+        if details is not None:
+            self._table.details[self._idx] = details
+
+
+class PlaceTable(Sequence[GMPlace]):
+    """
+    Column-oriented storage for the places of a large list: names in a list, coords in `array('d')`
+    and secrets packed as uint64 in `array('Q')`, instead of one `GMPlace` + `GMCoord` object per place.
+    Indexing hands out a fresh, lightweight `GMPlace` view with the same values as the stored place.
+    Details are only held for the few places they were loaded for, by row.
+    """
+
+    def __init__(self, service: 'GoogleMapsService' = None):
+        self.names: list[str] = []
+        self.lats = array('d')
+        self.lons = array('d')
+        self.secrets_1 = array('Q')
+        self.secrets_2 = array('Q')
+        # Which secrets are set, and which were negative before packing, see the _HAS/_NEGATIVE flags
+        self._flags = bytearray()
+        self.details: dict[int, GMPlaceDetails] = {}
+        self._service = service
+
+    @classmethod
+    def from_places(cls, places: Iterable[GMPlace], service: 'GoogleMapsService' = None) -> 'PlaceTable':
+        table = cls(service)
+        table.extend(places)
+        return table
+
+    def append(self, place: GMPlace) -> None:
+        flags = 0
+        if place.secret_1 is not None:
+            flags |= _HAS_SECRET_1 | (_NEGATIVE_SECRET_1 if place.secret_1 < 0 else 0)
+        if place.secret_2 is not None:
+            flags |= _HAS_SECRET_2 | (_NEGATIVE_SECRET_2 if place.secret_2 < 0 else 0)
+
+        self.names.append(place.name)
+        self.lats.append(place.coord.lat)
+        self.lons.append(place.coord.long)
+        self.secrets_1.append(to_uint64(place.secret_1) if place.secret_1 is not None else 0)
+        self.secrets_2.append(to_uint64(place.secret_2) if place.secret_2 is not None else 0)
+        self._flags.append(flags)
+        if place.has_details:
+            self.details[len(self.names) - 1] = place.details
+
+    def extend(self, places: Iterable[GMPlace]) -> None:
+        for place in places:
+            self.append(place)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, idx: int) -> GMPlace: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[GMPlace]: ...
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._view(i) for i in range(*idx.indices(len(self)))]
+
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('PlaceTable index out of range')
+        return self._view(idx)
+
+    def __iter__(self) -> Iterator[GMPlace]:
+        for idx in range(len(self)):
+            yield self._view(idx)
+
+    def _view(self, idx: int) -> GMPlace:
+        flags = self._flags[idx]
+        secret_1 = _from_uint64(self.secrets_1[idx], flags & _NEGATIVE_SECRET_1) if flags & _HAS_SECRET_1 else None
+        secret_2 = _from_uint64(self.secrets_2[idx], flags & _NEGATIVE_SECRET_2) if flags & _HAS_SECRET_2 else None
+        return _PlaceView(self, idx, self.names[idx], self.lats[idx], self.lons[idx], secret_1, secret_2)
+
+    def __repr__(self):
+        return f'[PlaceTable] {len(self)} places'
@@ -0,0 +1,97 @@
+import math
+from collections import defaultdict
+from typing import Sequence
+
+from src.google_maps_tool.helpers import EARTH_RADIUS_KM, haversine
+
+
+class GridIndex:
+    """
+    Buckets (lat, lon) points into square cells of `cell_size_deg` degrees.
+    Queries only look at the cells overlapping the bounding box of the search area,
+    and return positions into the original `coords` sequence, in ascending order.
+    """
+
+    def __init__(self, coords: Sequence[tuple[float, float]], cell_size_deg: float = 0.25):
+        self.coords = coords
+        self.cell_size_deg = cell_size_deg
+        self._cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+
+        for idx, (lat, lon) in enumerate(coords):
+            self._cells[self._cell(lat, lon)].append(idx)
+
+    def __len__(self):
+        return len(self.coords)
+
+    def query_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> list[int]:
+        """Points inside the box. A box with `min_lon > max_lon` wraps around the antimeridian."""
+        if min_lon > max_lon:
+            lon_ranges = [(min_lon, 180.0), (-180.0, max_lon)]
+        else:
+            lon_ranges = [(min_lon, max_lon)]
+
+        matches = []
+        for lon_from, lon_to in lon_ranges:
+            for idx in self._candidates(min_lat, lon_from, max_lat, lon_to):
+                lat, lon = self.coords[idx]
+                if min_lat <= lat <= max_lat and lon_from <= lon <= lon_to:
+                    matches.append(idx)
+
+        return sorted(matches)
+
+    def query_radius(self, center_lat: float, center_lon: float, radius_km: float) -> list[int]:
+        """Points within `radius_km` (great-circle distance) of the center."""
+        matches = []
+        for min_lat, min_lon, max_lat, max_lon in _bounding_boxes(center_lat, center_lon, radius_km):
+            for idx in self._candidates(min_lat, min_lon, max_lat, max_lon):
+                lat, lon = self.coords[idx]
+                if (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+                        and haversine(lat, lon, center_lat, center_lon) <= radius_km):
+                    matches.append(idx)
+
+        return sorted(matches)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_size_deg), math.floor(lon / self.cell_size_deg)
+
+    def _candidates(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+        min_x, min_y = self._cell(min_lat, min_lon)
+        max_x, max_y = self._cell(max_lat, max_lon)
+
+        if (max_x - min_x + 1) * (max_y - min_y + 1) > len(self._cells):
+            # The box covers more cells than are occupied, walking the occupied ones is cheaper
+            for (x, y), indices in self._cells.items():
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    yield from indices
+            return
+
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                yield from self._cells.get((x, y), ())
+
+
+def _bounding_boxes(lat: float, lon: float, radius_km: float) -> list[tuple[float, float, float, float]]:
+    """
+    Boxes (min_lat, min_lon, max_lat, max_lon) that together contain every point within `radius_km`.
+    See http://janmatuschek.de/LatitudeLongitudeBoundingCoordinates for the derivation.
+    """
+    angular_radius = radius_km / EARTH_RADIUS_KM
+    # Small margin, so rounding never drops a point lying exactly on the circle
+    margin = 1e-9
+
+    min_lat = math.degrees(math.radians(lat) - angular_radius) - margin
+    max_lat = math.degrees(math.radians(lat) + angular_radius) + margin
+
+    if min_lat <= -90 or max_lat >= 90 or angular_radius >= math.pi / 2:
+        # A pole is inside the circle, so it spans every longitude
+        return [(max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0)]
+
+    sin_delta_lon = min(1.0, math.sin(angular_radius) / math.cos(math.radians(lat)))
+    delta_lon = math.degrees(math.asin(sin_delta_lon)) + margin
+    min_lon, max_lon = lon - delta_lon, lon + delta_lon
+
+    if min_lon < -180:
+        return [(min_lat, min_lon + 360, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    if max_lon > 180:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon - 360)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
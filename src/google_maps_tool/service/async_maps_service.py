@@ -0,0 +1,226 @@
+import asyncio
+import codecs
+import time
+from typing import Callable, Iterable
+
+import aiohttp
+
+from src.google_maps_tool.models.list import GMList
+from src.google_maps_tool.models.place import GMPlace, GMPlaceDetails
+from src.google_maps_tool.service import endpoints, json_select
+from src.google_maps_tool.service.context import (AUTH_ERROR_STATUSES, MAPS_PAGE_CHUNK_SIZE, AppOptionsScanner,
+                                                  ServiceError, ServiceToken, TokenStore,
+                                                  service_tokens_from_app_options)
+from src.google_maps_tool.service.metrics import Metrics, endpoint_label
+from src.google_maps_tool.service.transport import DEFAULT_HEADERS, EndpointPolicy, TransportConfig
+
+
+def create_client_session(cookies: dict[str, str], connection_limit: int = 10) -> aiohttp.ClientSession:
+    """Create the shared connection pool used by `AsyncGoogleMapsContext`. Must be called inside a running loop."""
+    return aiohttp.ClientSession(cookies=cookies,
+                                 headers=DEFAULT_HEADERS,
+                                 connector=aiohttp.TCPConnector(limit=connection_limit))
+
+
+def _client_timeout(policy: EndpointPolicy) -> aiohttp.ClientTimeout:
+    return aiohttp.ClientTimeout(sock_connect=policy.connect_timeout, sock_read=policy.read_timeout)
+
+
+class AsyncGoogleMapsContext:
+    def __init__(self, session: aiohttp.ClientSession, token_store: TokenStore | None = None,
+                 transport: TransportConfig | None = None, base_url: str | None = None,
+                 metrics: Metrics | None = None):
+        self.session = session
+        self.token_store = token_store
+        self.transport = transport or TransportConfig()
+        self.base_url = base_url
+        self.metrics = metrics or Metrics()
+        self.tokens: dict[ServiceToken, str] = {}
+        self._generation = 0
+        self._tokens_lock = asyncio.Lock()
+
+    async def ensure_tokens(self):
+        if self.tokens:
+            return
+
+        # Concurrent callers wait for the first one instead of each downloading the page
+        async with self._tokens_lock:
+            if not self.tokens:
+                stored = self.token_store.load() if self.token_store else None
+                self.metrics.record_cache('token_store', stored is not None)
+                if stored is not None:
+                    self.tokens = stored
+                else:
+                    await self._fetch_tokens()
+
+    async def refresh_tokens(self, generation: int) -> None:
+        """Download new tokens, unless they have already been refreshed since `generation`."""
+        async with self._tokens_lock:
+            if self._generation == generation:
+                self.metrics.increment('token_refreshes')
+                await self._fetch_tokens()
+
+    async def _fetch_tokens(self) -> None:
+        self.metrics.increment('token_page_fetches')
+        scanner = AppOptionsScanner()
+        app_options = None
+        timeout = _client_timeout(self.transport.policy_for(endpoints.MAPS_PAGE_URL))
+        started = time.perf_counter()
+        async with self.session.get(self.url(endpoints.MAPS_PAGE_URL), timeout=timeout) as response:
+            self.metrics.record_response(endpoint_label(endpoints.MAPS_PAGE_URL), response.status,
+                                         time.perf_counter() - started, response.content_length or 0)
+            response.raise_for_status()
+            decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')()
+            async for chunk in response.content.iter_chunked(MAPS_PAGE_CHUNK_SIZE):
+                app_options = scanner.feed(decoder.decode(chunk))
+                if app_options is not None:
+                    break
+
+        if app_options is None:
+            raise ServiceError("APP_OPTIONS not found in HTML")
+
+        self.tokens = service_tokens_from_app_options(app_options)
+        self._generation += 1
+        if self.token_store:
+            self.token_store.save(self.tokens)
+
+    async def get_token(self, service: ServiceToken) -> str:
+        await self.ensure_tokens()
+        return self.tokens[service]
+
+    def url(self, url: str) -> str:
+        return endpoints.rebase_url(url, self.base_url) if self.base_url else url
+
+    async def get_text(self, url: str, build_params: Callable[[dict[ServiceToken, str]], dict]) -> str:
+        """Same as `GoogleMapsContext.get`, but returns the decoded body and raises on HTTP errors."""
+        await self.ensure_tokens()
+        url = self.url(url)
+        generation = self._generation
+
+        try:
+            return await self._send(url, build_params(self.tokens))
+        except aiohttp.ClientResponseError as e:
+            if e.status not in AUTH_ERROR_STATUSES:
+                raise
+
+        await self.refresh_tokens(generation)
+        return await self._send(url, build_params(self.tokens))
+
+    async def _send(self, url: str, params: dict) -> str:
+        """Async counterpart of `transport.send_with_retries`, raising on HTTP errors."""
+        timeout = _client_timeout(self.transport.policy_for(url))
+        attempts = self.transport.attempts_for(url)
+        label = endpoint_label(url)
+
+        for attempt in range(attempts):
+            is_last = attempt == attempts - 1
+            if attempt:
+                self.metrics.record_retry(label)
+
+            started = time.perf_counter()
+            try:
+                async with self.session.get(url, params=params, timeout=timeout) as response:
+                    if is_last or response.status not in self.transport.retry_statuses:
+                        body = await response.read()
+                        self.metrics.record_response(label, response.status, time.perf_counter() - started,
+                                                     len(body))
+                        response.raise_for_status()
+                        return json_select.decode_body(body)
+
+                    self.metrics.record_response(label, response.status, time.perf_counter() - started,
+                                                 response.content_length or 0)
+                    delay = self.transport.backoff(attempt, response.headers.get('Retry-After'))
+                    if delay is None:
+                        response.raise_for_status()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.metrics.record_error(label, time.perf_counter() - started)
+                if is_last:
+                    raise
+                delay = self.transport.backoff(attempt)
+
+            await asyncio.sleep(delay)
+
+
+class AsyncGoogleMapsService:
+    """
+    asyncio counterpart of `GoogleMapsService`. Builds the same requests and models, but returned lists and
+    places are bound to this service, so use `await service.get_all_places(gmlist)` and
+    `await service.load_place_details(gmplace)` instead of the lazy `GMList.places` / `GMPlace.details`.
+    """
+
+    def __init__(self, context: AsyncGoogleMapsContext):
+        self.context = context
+        self._cached_lists: list[GMList] = []
+
+    def invalidate_cache(self) -> None:
+        self._cached_lists = []
+
+    async def get_all_lists(self, use_cache=True) -> list[GMList]:
+        if use_cache and self._cached_lists:
+            return self._cached_lists
+
+        text = await self.context.get_text(endpoints.GET_ALL_LISTS_URL,
+                                           lambda tokens: endpoints.get_all_lists_params(tokens[ServiceToken.SESSION]))
+
+        self._cached_lists = endpoints.lists_from_response(text, service=self)
+        return self._cached_lists
+
+    async def get_all_places(self, gmlist: GMList, page_size: int = endpoints.LIST_PAGE_SIZE) -> list[GMPlace]:
+        places: list[GMPlace] = []
+        seen: set[GMPlace] = set()
+        while True:
+            offset = len(places)
+            text = await self.context.get_text(
+                endpoints.GET_LIST_URL,
+                lambda tokens: endpoints.get_list_params(gmlist, tokens[ServiceToken.SESSION],
+                                                         page_size=page_size, offset=offset))
+            page = endpoints.places_from_response(text, service=self)
+
+            new_places = endpoints.new_places_on_page(page, seen)
+            places.extend(new_places)
+            if not new_places or len(page) < page_size:
+                break
+
+        # Fill the list, so that `gmlist.places` doesn't try to load them again synchronously
+        gmlist.set_places(places)
+        return places
+
+    async def get_lists_with_places(self) -> list[GMList]:
+        """Fetch all lists, then the places of every list concurrently."""
+        lists = await self.get_all_lists()
+        await asyncio.gather(*(self.get_all_places(gmlist) for gmlist in lists))
+        return lists
+
+    async def get_place_details(self, gmplace: GMPlace) -> dict:
+        return endpoints.parse_response(await self._get_place_details_text(gmplace))
+
+    async def _get_place_details_text(self, gmplace: GMPlace) -> str:
+        return await self.context.get_text(
+            endpoints.GET_PLACE_DETAILS_URL,
+            lambda tokens: endpoints.get_place_details_params(gmplace, tokens[ServiceToken.SESSION]))
+
+    async def load_place_details(self, gmplace: GMPlace) -> GMPlaceDetails:
+        details = endpoints.place_details_from_response(await self._get_place_details_text(gmplace))
+        gmplace.details = details
+        return details
+
+    async def load_all_details(self, gmplaces: Iterable[GMPlace]) -> list[GMPlaceDetails]:
+        return await asyncio.gather(*(self.load_place_details(gmplace) for gmplace in gmplaces))
+
+    async def add_place_to_list(self, gmplace: GMPlace, gmlist: GMList) -> bool:
+        try:
+            if gmplace.is_coords_only and not gmplace.has_details:
+                # The payload of coords-only places needs the short name from the details
+                await self.load_place_details(gmplace)
+
+            await self.context.get_text(
+                endpoints.CREATE_ITEM_URL,
+                lambda tokens: endpoints.create_item_params(gmplace, gmlist, tokens[ServiceToken.SESSION],
+                                                            tokens[ServiceToken.ADD_TO_LIST]))
+        except Exception as e:
+            print(f"Failed to add {gmplace.name} → {str(e)}")
+            return False
+
+        # We invalidate the cache, since the order of the lists might have changed
+        self.invalidate_cache()
+        return True
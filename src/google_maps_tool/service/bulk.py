@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from src.google_maps_tool.models.place import GMPlace
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+DEFAULT_BURST = 10
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows bursts of up to `burst` requests,
+    refilled at `rate` tokens per second.
+    """
+
+    def __init__(self, rate: float = DEFAULT_REQUESTS_PER_SECOND, burst: int = DEFAULT_BURST):
+        if rate <= 0 or burst < 1:
+            raise ValueError('rate must be positive and burst at least 1')
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+@dataclass
+class AddPlaceResult:
+    place: GMPlace
+    success: bool
+    error: str | None = None
+    elapsed: float = 0.0
+
+
+def bulk_add(add: Callable[[GMPlace], None], gmplaces: Iterable[GMPlace],
+             max_workers: int = DEFAULT_MAX_WORKERS,
+             rate_limiter: TokenBucket | None = None,
+             on_result: Callable[[AddPlaceResult], None] | None = None) -> list[AddPlaceResult]:
+    """
+    Call `add` for every place on a pool of `max_workers` threads, throttled by `rate_limiter`.
+    `add` signals a failure by raising. Results are returned in the order of `gmplaces`;
+    `on_result` is called from the calling thread as each one completes.
+    """
+    gmplaces = list(gmplaces)
+    rate_limiter = rate_limiter or TokenBucket()
+    results: list[AddPlaceResult | None] = [None] * len(gmplaces)
+
+    def add_one(gmplace: GMPlace) -> AddPlaceResult:
+        rate_limiter.acquire()
+        started_at = time.monotonic()
+        try:
+            add(gmplace)
+        except Exception as e:
+            return AddPlaceResult(gmplace, False, str(e), time.monotonic() - started_at)
+        return AddPlaceResult(gmplace, True, None, time.monotonic() - started_at)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(add_one, gmplace): idx for idx, gmplace in enumerate(gmplaces)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if on_result:
+                on_result(result)
+
+    return results
@@ -0,0 +1,175 @@
+import json
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS place_details (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS place_details_accessed_at ON place_details (accessed_at);
+"""
+
+_LISTS_KEY = 'lists'
+
+
+def _places_key(list_id: str) -> str:
+    return f'places:{list_id}'
+
+
+def details_key(gmplace: 'GMPlace') -> str:
+    """Key of a place in the details cache, made of its `identity_key`."""
+    kind = 'c' if gmplace.is_coords_only else 's'
+    return ':'.join(str(part) for part in (kind, *gmplace.identity_key))
+
+
+class _SqliteStore:
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return time.time() - stored_at > self.ttl_seconds
+
+
+class SnapshotCache(_SqliteStore):
+    """
+    On-disk store for the lists overview and the places of each list, so they survive between runs.
+    Entries older than `ttl_seconds` are treated as missing.
+    """
+
+    def __init__(self, path: str = 'gmaps_cache.sqlite3', ttl_seconds: float = 6 * 60 * 60):
+        super().__init__(path, ttl_seconds)
+
+    def get_lists(self) -> list[dict] | None:
+        return self._get(_LISTS_KEY)
+
+    def put_lists(self, lists: list[dict]) -> None:
+        self._put(_LISTS_KEY, lists)
+
+    def get_places(self, list_id: str) -> list[dict] | None:
+        return self._get(_places_key(list_id))
+
+    def put_places(self, list_id: str, places: list[dict]) -> None:
+        self._put(_places_key(list_id), places)
+
+    def append_places(self, list_id: str, places: list[dict]) -> None:
+        """Add places to the cached places of a list. Nothing happens if that list isn't cached."""
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT payload, stored_at FROM snapshots WHERE key = ?',
+                                     (_places_key(list_id),)).fetchone()
+            if row is None or self._is_expired(row[1]):
+                return
+
+            # The entry keeps its age, it is only as fresh as the download it came from
+            self._conn.execute('UPDATE snapshots SET payload = ? WHERE key = ?',
+                               (json.dumps(json.loads(row[0]) + places), _places_key(list_id)))
+
+    def invalidate_lists(self) -> None:
+        self._delete(_LISTS_KEY)
+
+    def invalidate_list(self, list_id: str) -> None:
+        """Drop the cached places of a single list."""
+        self._delete(_places_key(list_id))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM snapshots')
+
+    def _get(self, key: str):
+        with self._lock:
+            row = self._conn.execute('SELECT payload, stored_at FROM snapshots WHERE key = ?', (key,)).fetchone()
+
+        if row is None:
+            return None
+
+        payload, stored_at = row
+        if self._is_expired(stored_at):
+            self._delete(key)
+            return None
+
+        return json.loads(payload)
+
+    def _put(self, key: str, value) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO snapshots (key, payload, stored_at) VALUES (?, ?, ?)',
+                               (key, json.dumps(value), time.time()))
+
+    def _delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM snapshots WHERE key = ?', (key,))
+
+
+class DetailsCache(_SqliteStore):
+    """
+    On-disk store for the fields of `GMPlaceDetails`, keyed by `details_key`.
+    Holds at most `max_entries` places, evicting the least recently used ones first.
+    """
+
+    def __init__(self, path: str = 'gmaps_cache.sqlite3', ttl_seconds: float = 7 * 24 * 60 * 60,
+                 max_entries: int = 5000):
+        super().__init__(path, ttl_seconds)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT payload, stored_at FROM place_details WHERE key = ?', (key,)).fetchone()
+
+            if row is not None and self._is_expired(row[1]):
+                self._conn.execute('DELETE FROM place_details WHERE key = ?', (key,))
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute('UPDATE place_details SET accessed_at = ? WHERE key = ?', (now, key))
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, fields: dict) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO place_details (key, payload, stored_at, accessed_at) '
+                               'VALUES (?, ?, ?, ?)', (key, json.dumps(fields), now, now))
+
+            (count,) = self._conn.execute('SELECT COUNT(*) FROM place_details').fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute('DELETE FROM place_details WHERE key IN '
+                                   '(SELECT key FROM place_details ORDER BY accessed_at ASC LIMIT ?)', (overflow,))
+                self.evictions += overflow
+
+    def invalidate(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM place_details WHERE key = ?', (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM place_details')
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
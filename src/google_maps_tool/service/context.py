@@ -1,8 +1,17 @@
 import json
+import os
 import re
+import threading
+import time
 from enum import Enum
+from typing import TYPE_CHECKING, Callable
 
-import requests
+from src.google_maps_tool.service.endpoints import MAPS_PAGE_URL, rebase_url
+from src.google_maps_tool.service.metrics import Metrics
+from src.google_maps_tool.service.transport import TransportConfig, send_with_retries
+
+if TYPE_CHECKING:
+    import requests
 
 
 class ServiceToken(Enum):
@@ -10,37 +19,201 @@ class ServiceToken(Enum):
     ADD_TO_LIST = 'add_to_list'
 
 
+# Statuses returned when the service tokens are no longer accepted
+AUTH_ERROR_STATUSES = frozenset({401, 403})
+
+
+class ServiceError(RuntimeError):
+    """The service couldn't be reached, rejected a request, or answered with something that isn't a response."""
+
+
+_APP_OPTIONS_MARKER = 'window.APP_OPTIONS'
+_APP_OPTIONS_PATTERN = re.compile(r'window\.APP_OPTIONS\s*=\s*(\[.*?]]]);', re.S)
+MAPS_PAGE_CHUNK_SIZE = 64 * 1024
+
+
+class TokenStore:
+    """
+    Service tokens saved in a JSON file along with the time they were fetched, so that the maps page is
+    only downloaded again once they stop working (or are older than `max_age_seconds`, if given).
+    """
+
+    def __init__(self, path: str, max_age_seconds: float | None = None):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+
+    def load(self) -> dict[ServiceToken, str] | None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if self.max_age_seconds is not None and time.time() - data['fetched_at'] > self.max_age_seconds:
+                return None
+            tokens = {ServiceToken[name]: value for name, value in data['tokens'].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+        # A file written for other token types is as good as no file
+        return tokens if set(tokens) == set(ServiceToken) else None
+
+    def save(self, tokens: dict[ServiceToken, str]) -> None:
+        data = {'fetched_at': time.time(), 'tokens': {token.name: value for token, value in tokens.items()}}
+
+        # Write next to the file and swap, so that a crash never leaves half a file behind
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
 class GoogleMapsContext:
-    def __init__(self, session: requests.Session):
-        self.session = session
+    def __init__(self, session: 'requests.Session | None' = None, token_store: TokenStore | None = None,
+                 transport: TransportConfig | None = None, base_url: str | None = None,
+                 metrics: Metrics | None = None,
+                 session_factory: 'Callable[[], requests.Session] | None' = None):
+        if session is None and session_factory is None:
+            raise ValueError('Either a session or a session_factory is needed')
+
+        # Without a session, `session_factory` creates it on the first request (loading cookies, importing requests)
+        self._session = session
+        self._session_factory = session_factory
+        self._session_lock = threading.Lock()
+        self.token_store = token_store
+        self.transport = transport or TransportConfig()
+        # Scheme and host to send the requests to instead of https://www.google.com, e.g. a local stand-in server
+        self.base_url = base_url
+        # Requests sent through the session and cache lookups of the service, see the Stats menu
+        self.metrics = metrics or Metrics()
         self.tokens: dict[ServiceToken, str] = {}
+        # Bumped on every refresh, so that callers that failed with the same tokens only refresh them once
+        self._generation = 0
+        self._tokens_lock = threading.Lock()
+
+    @property
+    def session(self) -> 'requests.Session':
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._session_factory()
+        return self._session
 
     def ensure_tokens(self):
-        if not self.tokens:
-            html = self.session.get("https://www.google.com/maps?hl=en&authuser=0").text
-            self.tokens = get_service_tokens(html)
+        if self.tokens:
+            return
+
+        with self._tokens_lock:
+            if not self.tokens:
+                stored = self.token_store.load() if self.token_store else None
+                self.metrics.record_cache('token_store', stored is not None)
+                if stored is not None:
+                    self.tokens = stored
+                else:
+                    self._fetch_tokens()
+
+    def refresh_tokens(self, generation: int) -> None:
+        """
+        Download new tokens, unless they have already been refreshed since `generation`.
+        Concurrent callers wait for the first one and reuse its tokens.
+        """
+        with self._tokens_lock:
+            if self._generation == generation:
+                self.metrics.increment('token_refreshes')
+                self._fetch_tokens()
+
+    def _fetch_tokens(self) -> None:
+        self.metrics.increment('token_page_fetches')
+        with send_with_retries(self.session, self.url(MAPS_PAGE_URL), None, self.transport, stream=True,
+                               metrics=self.metrics) as response:
+            response.raise_for_status()
+            response.encoding = response.encoding or 'utf-8'
+            app_options = extract_app_options_from_chunks(
+                response.iter_content(chunk_size=MAPS_PAGE_CHUNK_SIZE, decode_unicode=True))
+
+        self.tokens = service_tokens_from_app_options(app_options)
+        self._generation += 1
+        if self.token_store:
+            self.token_store.save(self.tokens)
 
     def get_token(self, service: ServiceToken) -> str:
         self.ensure_tokens()
         return self.tokens[service]
 
+    def url(self, url: str) -> str:
+        return rebase_url(url, self.base_url) if self.base_url else url
+
+    def get(self, url: str, build_params: Callable[[dict[ServiceToken, str]], dict]) -> 'requests.Response':
+        """
+        GET `url` with the params built from the current tokens. If the tokens are rejected,
+        they are refreshed and the request is sent once more, with params built from the new tokens.
+        """
+        self.ensure_tokens()
+        url = self.url(url)
+        generation, tokens = self._generation, self.tokens
+
+        response = send_with_retries(self.session, url, build_params(tokens), self.transport, metrics=self.metrics)
+        if response.status_code not in AUTH_ERROR_STATUSES:
+            return response
+
+        response.close()
+        self.refresh_tokens(generation)
+        return send_with_retries(self.session, url, build_params(self.tokens), self.transport, metrics=self.metrics)
+
+
+class AppOptionsScanner:
+    """
+    Finds `window.APP_OPTIONS` in the maps page while it is being downloaded, one chunk at a time.
+    Only the text from the marker onwards is kept, and `feed` returns the parsed options as soon as they are complete.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._found_marker = False
+
+    def feed(self, chunk: str):
+        self._buffer += chunk
+
+        if not self._found_marker:
+            start = self._buffer.find(_APP_OPTIONS_MARKER)
+            if start < 0:
+                # Keep the tail, in case the marker is split across chunks
+                self._buffer = self._buffer[-len(_APP_OPTIONS_MARKER):]
+                return None
+            self._buffer = self._buffer[start:]
+            self._found_marker = True
+
+        m = _APP_OPTIONS_PATTERN.search(self._buffer)
+        return json.loads(m.group(1)) if m else None
+
+
+def extract_app_options_from_chunks(chunks):
+    scanner = AppOptionsScanner()
+    for chunk in chunks:
+        app_options = scanner.feed(chunk)
+        if app_options is not None:
+            return app_options
+    raise ServiceError("APP_OPTIONS not found in HTML")
+
 
 def extract_app_options(html: str):
-    m = re.search(r'window\.APP_OPTIONS\s*=\s*(\[.*?]]]);', html, re.S)
-    if not m:
-        raise RuntimeError("APP_OPTIONS not found in HTML")
-    return json.loads(m.group(1))
+    return extract_app_options_from_chunks([html])
 
 
 def get_service_tokens(html: str) -> dict[ServiceToken, str]:
-    app_options = extract_app_options(html)
+    return service_tokens_from_app_options(extract_app_options(html))
+
 
+def service_tokens_from_app_options(app_options) -> dict[ServiceToken, str]:
     tokens: dict[ServiceToken, str] = {}
 
     try:
         tokens[ServiceToken.ADD_TO_LIST] = app_options[28][28]
         tokens[ServiceToken.SESSION] = app_options[11]
     except Exception as e:
-        raise RuntimeError(f"Could not find token in APP_OPTIONS, {e}\nYour __Secure-1PSIDTS token may be expired.")
+        raise ServiceError(f"Could not find token in APP_OPTIONS, {e}\nYour __Secure-1PSIDTS token may be expired.")
 
     return tokens
@@ -0,0 +1,141 @@
+"""
+Request parameters and response parsing for the Google Maps endpoints, shared by the sync and async services.
+"""
+import functools
+from urllib.parse import urlsplit, urlunsplit
+
+from src.google_maps_parser.pb_template import PbTemplate, slot
+from src.google_maps_tool.models.list import GMList
+from src.google_maps_tool.models.place import GMPlace, GMPlaceDetails
+from src.google_maps_tool.service import json_select
+
+MAPS_PAGE_URL = 'https://www.google.com/maps?hl=en&authuser=0'
+GET_ALL_LISTS_URL = 'https://www.google.com/locationhistory/preview/mas'
+GET_LIST_URL = 'https://www.google.com/maps/preview/entitylist/getlist'
+GET_PLACE_DETAILS_URL = 'https://www.google.com/maps/preview/place'
+CREATE_ITEM_URL = 'https://www.google.com/maps/preview/entitylist/createitem'
+
+# Most places `getlist` returns per request
+LIST_PAGE_SIZE = 500
+
+
+def rebase_url(url: str, base_url: str) -> str:
+    """`url` with the scheme and host of `base_url`, e.g. to send it to a local stand-in server instead."""
+    parts = urlsplit(url)
+    base = urlsplit(base_url)
+    return urlunsplit((base.scheme, base.netloc, base.path.rstrip('/') + parts.path, parts.query, parts.fragment))
+
+
+def _params(pb: str, **extra) -> dict:
+    return {'authuser': '0',
+            'hl': 'en',
+            'gl': 'ro',
+            'pb': pb,
+            **extra}
+
+
+@functools.cache
+def _get_all_lists_template() -> PbTemplate:
+    return PbTemplate({
+        '2': {
+            '1': slot('session_token', 's'),
+            '7': 'e81',
+            '15': 'i17409'
+        },
+        '7': {
+            '1': 'i50'
+        },
+        '12': {
+            '1': 'i50'
+        },
+        '15': {
+            '1': 'i50'
+        },
+        '23': {
+            '1': 'i50',
+            '3': 'b1'
+        },
+        '24': {
+            '1': 'i50',
+            '3': 'b1'
+        },
+        '38': {
+            '1': 'i50', '3': 'b1'
+        }
+    })
+
+
+@functools.cache
+def _get_list_template(with_offset: bool) -> PbTemplate:
+    protobuffer = {
+        '1': {
+            '1': slot('list_id', 's'),
+            '2': 'e1',
+            '3': {
+                '1': 'e1'
+            }
+        },
+        '2': 'e2',
+        '3': 'e2',
+        '4': slot('page_size', 'i')
+    }
+    if with_offset:
+        # Index of the first place of the page
+        protobuffer['5'] = slot('offset', 'i')
+    protobuffer['6'] = {
+        '1': slot('session_token', 's'),
+        '7': 'e81',
+        '28': 'e2'
+    }
+    protobuffer['8'] = 'i3'
+    protobuffer['16'] = 'b1'
+    return PbTemplate(protobuffer)
+
+
+def get_all_lists_params(session_token: str) -> dict:
+    return _params(_get_all_lists_template().render(session_token=session_token))
+
+
+def get_list_params(gmlist: GMList, session_token: str, page_size: int = LIST_PAGE_SIZE, offset: int = 0) -> dict:
+    return _params(_get_list_template(bool(offset)).render(list_id=gmlist.id,
+                                                           page_size=page_size,
+                                                           offset=offset,
+                                                           session_token=session_token))
+
+
+def new_places_on_page(page: list[GMPlace], seen: set[GMPlace]) -> list[GMPlace]:
+    """
+    Places of a `getlist` page that earlier pages didn't return. An empty result means we're past the end,
+    or the server ignored the offset and sent a page we already have.
+    """
+    new = [place for place in page if place not in seen]
+    seen.update(new)
+    return new
+
+
+def get_place_details_params(gmplace: GMPlace, session_token: str) -> dict:
+    return _params(gmplace.build_get_details_payload(session_token),
+                   q=f'{gmplace.coord.lat},{gmplace.coord.long}')
+
+
+def create_item_params(gmplace: GMPlace, gmlist: GMList, session_token: str, add_to_list_token: str) -> dict:
+    return _params(gmplace.build_add_payload(gmlist, session_token, add_to_list_token))
+
+
+def parse_response(text: str):
+    """Decode a whole response body, skipping the `)]}'` anti-JSON-hijacking prefix."""
+    return json_select.decode_all(text)
+
+
+def lists_from_response(text: str, service) -> list[GMList]:
+    json_lists = json_select.select(text, 29, 3) or []
+    return [GMList.from_json(json_list, index, service=service) for index, json_list in enumerate(json_lists)]
+
+
+def places_from_response(text: str, service) -> list[GMPlace]:
+    json_places = json_select.select(text, 0, 8) or []
+    return [GMPlace.from_json(json_place, service) for json_place in json_places]
+
+
+def place_details_from_response(text: str) -> GMPlaceDetails:
+    return GMPlaceDetails.from_place_json(json_select.select(text, 6))
@@ -0,0 +1,210 @@
+"""
+Streams the places of one or more lists to a file, one record per place, optionally with their details.
+Records are written as they are produced, in batches of `EXPORT_BATCH_SIZE` places. Downloaded places aren't kept
+for the snapshot cache either, so memory doesn't grow with the lists (a list answered from the snapshot cache is
+the exception, its snapshot is read in one piece).
+NDJSON and CSV are always available; Parquet needs `pip install pyarrow`.
+"""
+import abc
+import csv
+import itertools
+import json
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable
+
+if TYPE_CHECKING:
+    from src.google_maps_tool.models.list import GMList
+    from src.google_maps_tool.models.place import GMPlace, GMPlaceDetails
+    from src.google_maps_tool.service.maps_service import GoogleMapsService
+
+FORMATS = ('ndjson', 'csv', 'parquet')
+_EXTENSIONS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv', '.parquet': 'parquet'}
+
+PLACE_FIELDS = ('name', 'lat', 'lon', 'secret_1', 'secret_2')
+DETAILS_FIELDS = ('address', 'category', 'avg_rating', 'review_count', 'avg_price', 'website',
+                  'phone_number', 'plus_code', 'open_hours')
+LIST_FIELDS = ('list_id', 'list_name')
+
+# Places whose details are loaded together, and how many records are buffered per Parquet row group
+EXPORT_BATCH_SIZE = 64
+PARQUET_ROW_GROUP_SIZE = 10_000
+DEFAULT_DETAILS_WORKERS = 4
+DEFAULT_DETAILS_REQUESTS_PER_SECOND = 5.0
+
+
+def place_record(gmplace: 'GMPlace', details: 'GMPlaceDetails | None' = None) -> dict:
+    record = {'name': gmplace.name, 'lat': gmplace.coord.lat, 'lon': gmplace.coord.long,
+              'secret_1': gmplace.secret_1, 'secret_2': gmplace.secret_2}
+    if details is not None:
+        record.update({'address': details.full_address, 'category': details.category,
+                       'avg_rating': details.avg_rating, 'review_count': details.review_count,
+                       'avg_price': details.avg_price, 'website': details.website,
+                       'phone_number': details.phone_number, 'plus_code': details.plus_code,
+                       'open_hours': details.open_hours})
+    return record
+
+
+def export_fields(with_details: bool) -> tuple[str, ...]:
+    return LIST_FIELDS + PLACE_FIELDS + (DETAILS_FIELDS if with_details else ())
+
+
+def format_from_path(path: str) -> str:
+    for extension, fmt in _EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return fmt
+    raise ValueError(f'Cannot tell the format of `{path}`, give one of: {", ".join(FORMATS)}')
+
+
+class _TextPlaceWriter(abc.ABC):
+    """Writes to the file at `path`, or to stdout if it is '-'."""
+
+    def __init__(self, path: str, fields: tuple[str, ...]):
+        self.fields = fields
+        self._file = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+
+    @abc.abstractmethod
+    def write(self, record: dict) -> None:
+        ...
+
+    def close(self) -> None:
+        if self._file is sys.stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class NdjsonPlaceWriter(_TextPlaceWriter):
+    """One JSON object per line."""
+
+    def write(self, record: dict) -> None:
+        self._file.write(json.dumps({field: record.get(field) for field in self.fields}, ensure_ascii=False))
+        self._file.write('\n')
+
+
+class CsvPlaceWriter(_TextPlaceWriter):
+    """A header row, then one row per place. Opening hours are joined with `; `."""
+
+    def __init__(self, path: str, fields: tuple[str, ...]):
+        super().__init__(path, fields)
+        self._writer = csv.DictWriter(self._file, fieldnames=fields, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, record: dict) -> None:
+        hours = record.get('open_hours')
+        if hours is not None:
+            record = dict(record, open_hours='; '.join(hours))
+        self._writer.writerow(record)
+
+
+class ParquetPlaceWriter:
+    """Columnar file written with `pyarrow.parquet.ParquetWriter`, one row group per `row_group_size` records."""
+
+    def __init__(self, path: str, fields: tuple[str, ...], row_group_size: int = PARQUET_ROW_GROUP_SIZE):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError('Parquet export needs pyarrow: pip install pyarrow')
+
+        types = {'lat': pa.float64(), 'lon': pa.float64(), 'secret_1': pa.int64(), 'secret_2': pa.int64(),
+                 'avg_rating': pa.float64(), 'review_count': pa.int64(), 'open_hours': pa.list_(pa.string())}
+        self.fields = fields
+        self._schema = pa.schema([(field, types.get(field, pa.string())) for field in fields])
+        self._pa = pa
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._row_group_size = row_group_size
+        self._columns: dict[str, list] = {field: [] for field in fields}
+        self._rows = 0
+
+    def write(self, record: dict) -> None:
+        for field in self.fields:
+            self._columns[field].append(record.get(field))
+        self._rows += 1
+        if self._rows >= self._row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            self._writer.write_batch(self._pa.RecordBatch.from_pydict(self._columns, schema=self._schema))
+            self._columns = {field: [] for field in self.fields}
+            self._rows = 0
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_WRITERS = {'ndjson': NdjsonPlaceWriter, 'csv': CsvPlaceWriter, 'parquet': ParquetPlaceWriter}
+
+
+def open_place_writer(path: str, fmt: str | None = None, with_details: bool = False):
+    """A writer for `path`, in `fmt` or the format of its extension (NDJSON for stdout)."""
+    fmt = fmt or ('ndjson' if path == '-' else format_from_path(path))
+    if fmt == 'parquet' and path == '-':
+        raise ValueError('Parquet can only be written to a file')
+    return _WRITERS[fmt](path, export_fields(with_details))
+
+
+@dataclass
+class ExportReport:
+    lists: int = 0
+    places: int = 0
+    # Places written without details because loading them failed
+    details_failed: int = 0
+
+
+def export_places(service: 'GoogleMapsService', gmlists: Iterable['GMList'], writer,
+                  with_details: bool = False,
+                  details_workers: int = DEFAULT_DETAILS_WORKERS,
+                  requests_per_second: float = DEFAULT_DETAILS_REQUESTS_PER_SECOND,
+                  use_cache: bool = True,
+                  on_record: Callable[[dict], None] | None = None) -> ExportReport:
+    """
+    Write every place of `gmlists` to `writer`, list by list and page by page (see `GoogleMapsService.iter_places`).
+    With `with_details`, the details of each batch are loaded on `details_workers` threads, through the details
+    cache; only the requests that miss it are throttled to `requests_per_second`.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.google_maps_tool.service.bulk import TokenBucket
+
+    report = ExportReport()
+    rate_limiter = TokenBucket(requests_per_second, burst=details_workers)
+
+    def load_details(gmplace: 'GMPlace') -> 'GMPlaceDetails | None':
+        try:
+            return service.load_place_details(gmplace, use_cache=use_cache, rate_limiter=rate_limiter)
+        except Exception as e:
+            print(f'Failed to load the details of {gmplace.name} → {e}', file=sys.stderr)
+            return None
+
+    with ThreadPoolExecutor(details_workers, thread_name_prefix='export-details') as executor:
+        for gmlist in gmlists:
+            report.lists += 1
+            places = service.iter_places(gmlist, use_cache=use_cache, store_snapshot=False)
+            for batch in itertools.batched(places, EXPORT_BATCH_SIZE):
+                details = list(executor.map(load_details, batch)) if with_details else [None] * len(batch)
+
+                for gmplace, place_details in zip(batch, details):
+                    record = {'list_id': gmlist.id, 'list_name': gmlist.name, **place_record(gmplace, place_details)}
+                    writer.write(record)
+                    report.places += 1
+                    if with_details and place_details is None:
+                        report.details_failed += 1
+                    if on_record:
+                        on_record(record)
+
+    return report
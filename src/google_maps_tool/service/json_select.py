@@ -0,0 +1,65 @@
+import json
+import re
+from json.scanner import make_scanner
+
+# Responses start with this line, to prevent JSON hijacking
+RESPONSE_PREFIX = ")]}'"
+
+_decoder = json.JSONDecoder()
+_scan_once = make_scanner(_decoder)
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def body_start(text: str) -> int:
+    """Index of the JSON value in a response body, past the `)]}'` prefix, without copying the body."""
+    start = len(RESPONSE_PREFIX) if text.startswith(RESPONSE_PREFIX) else 0
+    return _WHITESPACE.match(text, start).end()
+
+
+def decode_body(content: bytes) -> str:
+    """
+    Text of a response body, decoded from its bytes once. The bodies are always UTF-8, so this skips the charset
+    detection `response.text` runs when the headers don't name one. `select` and `decode_all` then parse the text.
+    """
+    return content.decode('utf-8')
+
+
+def decode_all(text: str):
+    """Decode the whole JSON of a response body."""
+    return _decoder.raw_decode(text, body_start(text))[0]
+
+
+def select(text: str, *path: int, start: int | None = None):
+    """
+    Decode only the element at `path` (indices into nested arrays) of the JSON in `text`, like `maybe` would.
+    Elements before it are decoded one at a time and dropped, elements after it are never looked at,
+    so neither time nor memory is spent on the parts of the response nobody reads.
+    Returns None if the path doesn't exist in the JSON, and raises `JSONDecodeError` if the body isn't a JSON array,
+    e.g. the HTML of an error page.
+    """
+    idx = body_start(text) if start is None else start
+    if path and not text.startswith('[', idx):
+        raise json.JSONDecodeError('Response is not a JSON array', text, idx)
+
+    try:
+        for position in path:
+            if text[idx] != '[':
+                return None
+
+            idx = _WHITESPACE.match(text, idx + 1).end()
+            if text[idx] == ']':
+                return None
+
+            for _ in range(position):
+                _, idx = _scan_once(text, idx)
+                idx = _WHITESPACE.match(text, idx).end()
+                if text[idx] != ',':
+                    # End of the array, the path doesn't exist
+                    return None
+                idx = _WHITESPACE.match(text, idx + 1).end()
+
+        value, _ = _scan_once(text, idx)
+    except (StopIteration, IndexError) as e:
+        raise json.JSONDecodeError('Malformed response', text, idx) from e
+
+    return value
@@ -1,159 +1,324 @@
+import contextlib
+import dataclasses
 import json
+import re
+import threading
+from typing import Callable, Iterable, Iterator
 
-from src.google_maps_parser.gmaps_data_parser import GoogleMapsDataParser
-from src.google_maps_tool.service.context import GoogleMapsContext, ServiceToken
-from src.google_maps_tool.mock_data import mock_get_all_lists_response, mock_get_list_response
+from src.google_maps_tool.service.bulk import (AddPlaceResult, DEFAULT_BURST, DEFAULT_MAX_WORKERS,
+                                               DEFAULT_REQUESTS_PER_SECOND, TokenBucket, bulk_add)
+from src.google_maps_tool.service import endpoints, json_select
+from src.google_maps_tool.service.cache import DetailsCache, SnapshotCache, details_key
+from src.google_maps_tool.service.context import GoogleMapsContext, ServiceError, ServiceToken
+from src.google_maps_tool.service.metrics import Metrics
+from src.google_maps_tool.service.single_flight import SingleFlight
+from src.google_maps_tool.mock_data import (mock_get_all_lists_response, mock_get_list_response,
+                                            mock_get_place_details_response)
 from src.google_maps_tool.models.list import GMList
-from src.google_maps_tool.models.place import GMPlace
+from src.google_maps_tool.models.place import GMPlace, GMPlaceDetails
 
 USE_MOCK_DATA = False
 
 
 class GoogleMapsService:
-    def __init__(self, context: GoogleMapsContext):
+    def __init__(self, context: GoogleMapsContext, cache: SnapshotCache | None = None,
+                 details_cache: DetailsCache | None = None):
         self.context = context
+        self.cache = cache
+        self.details_cache = details_cache
+        self.metrics = context.metrics if context is not None else Metrics()
         self._cached_lists: list[GMList] = []
+        # Concurrent fetches of the same list, places or details share one request
+        self._flights = SingleFlight(on_shared=lambda key: self.metrics.increment(f'coalesced.{key[0]}'))
+        # Adds are applied locally as they succeed, written to the snapshot cache once per batch,
+        # and checked against the server on the next fetch of the lists
+        self._deltas_lock = threading.Lock()
+        self._batch_places: dict[str, list[GMPlace]] = {}
+        self._unreconciled: dict[str, int] = {}
 
-    def invalidate_cache(self) -> None:
+    def invalidate_cache(self, gmlist: GMList | None = None) -> None:
+        """Drop the cached lists overview and, if given, the cached places of `gmlist`."""
         self._cached_lists = []
+        if self.cache:
+            self.cache.invalidate_lists()
+            if gmlist is not None:
+                self.cache.invalidate_list(gmlist.id)
 
     def get_all_lists(self, use_cache=True) -> list[GMList]:
+        # Once a batch of adds is over, the next call reconciles with the server
+        use_cache = use_cache and not self._unreconciled
+
+        if use_cache:
+            self.metrics.record_cache('lists.memory', bool(self._cached_lists))
         if use_cache and self._cached_lists:
             return self._cached_lists
 
-        url = 'https://www.google.com/locationhistory/preview/mas'
-        protobuffer = {
-            '2': {
-                '1': f's{self.context.get_token(ServiceToken.SESSION)}',
-                '7': 'e81',
-                '15': 'i17409'
-            },
-            '7': {
-                '1': 'i50'
-            },
-            '12': {
-                '1': 'i50'
-            },
-            '15': {
-                '1': 'i50'
-            },
-            '23': {
-                '1': 'i50',
-                '3': 'b1'
-            },
-            '24': {
-                '1': 'i50',
-                '3': 'b1'
-            },
-            '38': {
-                '1': 'i50', '3': 'b1'
-            }
-        }
-        payload = {'authuser': '0',
-                   'hl': 'en',
-                   'gl': 'ro',
-                   'pb': GoogleMapsDataParser.encode(protobuffer)}
-
-        response = None
-        if USE_MOCK_DATA:
-            response = mock_get_all_lists_response
-        else:
-            try:
-                response = self.context.session.get(url, params=payload)
-            except Exception as e:
-                print(f"Failed to get all lists → {str(e)}")
+        if use_cache and self.cache:
+            snapshot = self.cache.get_lists()
+            self.metrics.record_cache('lists.snapshot', snapshot is not None)
+            if snapshot is not None:
+                self._cached_lists = [GMList(entry['id'], entry['name'], entry['places_count'], index, service=self)
+                                      for index, entry in enumerate(snapshot)]
+                return self._cached_lists
 
-        json_response = json.loads(response.text[4:])
+        with _service_errors():
+            if USE_MOCK_DATA:
+                text = mock_get_all_lists_response
+            else:
+                text = self._flights.do(('mas',), self._get_all_lists_text)
+            lists = endpoints.lists_from_response(text, service=self)
 
-        json_lists = json_response[29][3]
-        lists: list[GMList] = []
-        for index, json_list in enumerate(json_lists):
-            lists.append(GMList.from_json(json_list, index, service=self))
+        self._reconcile(lists)
 
         self._cached_lists = lists
+        self._store_lists_snapshot()
         return lists
 
-    def get_all_places(self, gmlist: GMList):
-        url = 'https://www.google.com/maps/preview/entitylist/getlist'
-        protobuffer = {
-            '1': {
-                '1': f's{gmlist.id}',
-                '2': 'e1',
-                '3': {
-                    '1': 'e1'
-                }
-            },
-            '2': 'e2',
-            '3': 'e2',
-            '4': 'i500',
-            '6': {
-                '1': f's{self.context.get_token(ServiceToken.SESSION)}',
-                '7': 'e81',
-                '28': 'e2'
-            },
-            '8': 'i3',
-            '16': 'b1'
-        }
-        payload = {'authuser': '0',
-                   'hl': 'en',
-                   'gl': 'ro',
-                   'pb': GoogleMapsDataParser.encode(protobuffer)}
-
-        response = None
+    def _store_lists_snapshot(self) -> None:
+        # An empty overview is more likely a bad response than an account without lists, so it isn't kept
+        if self.cache and self._cached_lists:
+            self.cache.put_lists([{'id': gmlist.id, 'name': gmlist.name, 'places_count': gmlist.places_count}
+                                  for gmlist in self._cached_lists])
+
+    def _reconcile(self, lists: list[GMList]) -> None:
+        """
+        Compare freshly fetched lists with the counts expected from the local deltas.
+        Lists that don't match drop their cached places, so that they are downloaded again when needed.
+        """
+        with self._deltas_lock:
+            expected_counts, self._unreconciled = self._unreconciled, {}
+
+        for gmlist in lists:
+            expected = expected_counts.get(gmlist.id)
+            if expected is not None and expected != gmlist.places_count and self.cache:
+                self.cache.invalidate_list(gmlist.id)
+
+    def _get_all_lists_text(self) -> str:
+        response = self.context.get(endpoints.GET_ALL_LISTS_URL,
+                                    lambda tokens: endpoints.get_all_lists_params(tokens[ServiceToken.SESSION]))
+        response.raise_for_status()
+        return json_select.decode_body(response.content)
+
+    def get_all_places(self, gmlist: GMList, use_cache=True) -> list[GMPlace]:
+        if use_cache and self.cache:
+            snapshot = self._get_places_snapshot(gmlist)
+            if snapshot is not None:
+                return [self._place_from_entry(entry) for entry in snapshot]
+
         if USE_MOCK_DATA:
-            response = mock_get_list_response
-        else:
-            response = self.context.session.get(url, params=payload)
+            return endpoints.places_from_response(mock_get_list_response, service=self)
+
+        # A copy, since every caller gets the same list
+        return list(self._flights.do(('getlist', gmlist.id), lambda: list(self._fetch_places(gmlist))))
 
-        json_response = json.loads(response.text[4:])
+    def iter_places(self, gmlist: GMList, page_size: int = endpoints.LIST_PAGE_SIZE,
+                    use_cache=True, store_snapshot=True) -> Iterator[GMPlace]:
+        """
+        Yield the places of `gmlist` page by page, requesting `page_size` places at a time.
+        With `store_snapshot`, the snapshot cache is filled once the last page has been consumed, which means holding
+        on to every place until then; without it, only a page or two is kept, however long the list is.
+        """
+        if use_cache and self.cache:
+            snapshot = self._get_places_snapshot(gmlist)
+            if snapshot is not None:
+                # Built one at a time, the snapshot's entries are all that is held
+                yield from map(self._place_from_entry, snapshot)
+                return
+
+        if USE_MOCK_DATA:
+            yield from endpoints.places_from_response(mock_get_list_response, service=self)
+            return
 
-        json_places = json_response[0][8]
+        yield from self._fetch_places(gmlist, page_size, store_snapshot=store_snapshot)
 
+    def _get_places_snapshot(self, gmlist: GMList) -> list[dict] | None:
+        snapshot = self.cache.get_places(gmlist.id)
+        self.metrics.record_cache('places.snapshot', snapshot is not None)
+        return snapshot
+
+    def _place_from_entry(self, entry: dict) -> GMPlace:
+        return GMPlace(entry['name'], entry['lat'], entry['long'], entry['secret_1'], entry['secret_2'], self)
+
+    def _fetch_places(self, gmlist: GMList, page_size: int = endpoints.LIST_PAGE_SIZE,
+                      store_snapshot=True) -> Iterator[GMPlace]:
         places: list[GMPlace] = []
+        seen: set[GMPlace] = set()
+        first_page: set[GMPlace] = set()
+        fetched = 0
+        while True:
+            offset = fetched
+            with _service_errors():
+                response = self.context.get(endpoints.GET_LIST_URL,
+                                            lambda tokens: endpoints.get_list_params(gmlist,
+                                                                                     tokens[ServiceToken.SESSION],
+                                                                                     page_size=page_size,
+                                                                                     offset=offset))
+                response.raise_for_status()
+                page = endpoints.places_from_response(json_select.decode_body(response.content), service=self)
+
+            new_places = endpoints.new_places_on_page(page, seen)
+            fetched += len(new_places)
+            if store_snapshot:
+                places.extend(new_places)
+            else:
+                # A server ignoring the offset sends the first page again, and a list changed meanwhile
+                # repeats the end of the previous one, so those two are enough to tell the new places apart
+                first_page = first_page or set(new_places)
+                seen = first_page | set(new_places)
+            yield from new_places
 
-        if json_places is not None:
-            for json_place in json_places:
-                places.append(GMPlace.from_json(json_place, self))
+            if not new_places or len(page) < page_size:
+                break
 
-        return places
+        if store_snapshot and self.cache and places:
+            self.cache.put_places(gmlist.id, [_place_entry(place) for place in places])
 
     def get_place_details(self, gmplace: GMPlace) -> dict:
-        url = 'https://www.google.com/maps/preview/place'
+        with _service_errors():
+            return endpoints.parse_response(self._get_place_details_text(gmplace))
 
-        protobuffer = gmplace.build_get_details_payload(self.context.get_token(ServiceToken.SESSION))
+    def _get_place_details_text(self, gmplace: GMPlace) -> str:
+        if USE_MOCK_DATA:
+            return mock_get_place_details_response
 
-        payload = {'authuser': '0',
-                   'hl': 'en',
-                   'gl': 'ro',
-                   'pb': GoogleMapsDataParser.encode(protobuffer),
-                   'q': f'{gmplace.coord.lat},{gmplace.coord.long}'}
+        return self._flights.do(('place', details_key(gmplace)), lambda: self._fetch_place_details_text(gmplace))
 
-        response = self.context.session.get(url, params=payload)
+    def _fetch_place_details_text(self, gmplace: GMPlace) -> str:
+        response = self.context.get(endpoints.GET_PLACE_DETAILS_URL,
+                                    lambda tokens: endpoints.get_place_details_params(gmplace,
+                                                                                      tokens[ServiceToken.SESSION]))
+        response.raise_for_status()
+        return json_select.decode_body(response.content)
 
-        return json.loads(response.text[4:])
+    def load_place_details(self, gmplace: GMPlace, use_cache=True,
+                           rate_limiter: TokenBucket | None = None) -> GMPlaceDetails:
+        """
+        Same as `get_place_details`, but parsed into `GMPlaceDetails` and served from the details cache if possible.
+        `rate_limiter` only throttles the places that have to be requested.
+        """
+        key = details_key(gmplace)
 
-    def add_place_to_list(self, gmplace: GMPlace, gmlist: GMList) -> bool:
-        url = 'https://www.google.com/maps/preview/entitylist/createitem'
+        if use_cache and self.details_cache:
+            fields = self.details_cache.get(key)
+            self.metrics.record_cache('details', fields is not None)
+            if fields is not None:
+                return GMPlaceDetails(**fields)
 
-        protobuffer = gmplace.build_add_payload(gmlist, self.context.get_token(ServiceToken.SESSION),
-                                                self.context.get_token(ServiceToken.ADD_TO_LIST))
+        if rate_limiter:
+            rate_limiter.acquire()
+        # Only the place entry of the response is decoded
+        with _service_errors():
+            details = endpoints.place_details_from_response(self._get_place_details_text(gmplace))
 
-        payload = {'authuser': '0',
-                   'hl': 'en',
-                   'gl': 'ro',
-                   'pb': GoogleMapsDataParser.encode(protobuffer)}
+        fields = dataclasses.asdict(details)
+        # Details without a single field come from a response without a place entry, not worth keeping for days
+        if self.details_cache and any(value is not None for value in fields.values()):
+            self.details_cache.put(key, fields)
+        return details
 
+    def add_place_to_list(self, gmplace: GMPlace, gmlist: GMList) -> bool:
         if USE_MOCK_DATA:
             print(f"✅ Added {gmplace.name} to '{gmlist.name}'")
             return True
-        else:
-            try:
-                response = self.context.session.get(url, params=payload)
-                if response.ok:
-                    # We invalidate the cache, since the order of the lists might have changed
-                    self.invalidate_cache()
-                    return True
-            except Exception as e:
-                print(f"Failed to add {gmplace.name} → {str(e)}")
-
-            return False
+
+        try:
+            self._create_item(gmplace, gmlist)
+            return True
+        except Exception as e:
+            print(f"Failed to add {gmplace.name} → {str(e)}")
+        finally:
+            self._end_add_batch()
+
+        return False
+
+    def add_places_to_list(self, gmplaces: Iterable[GMPlace], gmlist: GMList,
+                           max_workers: int = DEFAULT_MAX_WORKERS,
+                           requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                           burst: int = DEFAULT_BURST,
+                           on_result: Callable[[AddPlaceResult], None] | None = None) -> list[AddPlaceResult]:
+        """
+        Add many places to `gmlist` concurrently, at most `requests_per_second` on average.
+        Returns one `AddPlaceResult` per place, in the same order as `gmplaces`.
+        """
+        try:
+            return bulk_add(lambda gmplace: self._create_item(gmplace, gmlist), gmplaces,
+                            max_workers=max_workers,
+                            rate_limiter=TokenBucket(requests_per_second, burst),
+                            on_result=on_result)
+        finally:
+            self._end_add_batch()
+
+    def _create_item(self, gmplace: GMPlace, gmlist: GMList) -> None:
+        """Send the `createitem` request for a single place, raising if it fails."""
+        if USE_MOCK_DATA:
+            return
+
+        with _service_errors():
+            response = self.context.get(endpoints.CREATE_ITEM_URL,
+                                        lambda tokens: endpoints.create_item_params(gmplace, gmlist,
+                                                                                    tokens[ServiceToken.SESSION],
+                                                                                    tokens[ServiceToken.ADD_TO_LIST]))
+            response.raise_for_status()
+
+        self._apply_added_place(gmplace, gmlist)
+
+    def _apply_added_place(self, gmplace: GMPlace, gmlist: GMList) -> None:
+        """
+        Mirror a successful add locally instead of dropping the caches: the place is appended to the loaded places,
+        the count bumped, and the list moved to the top, since the server lists the most recently changed list first.
+        """
+        with self._deltas_lock:
+            cached = next((cached for cached in self._cached_lists if cached.id == gmlist.id), None)
+            for target in {id(target): target for target in (gmlist, cached) if target is not None}.values():
+                target.record_added_place(gmplace)
+
+            if cached is not None:
+                self._cached_lists.remove(cached)
+                self._cached_lists.insert(0, cached)
+                for index, reordered in enumerate(self._cached_lists):
+                    reordered.index = index
+            gmlist.index = 0
+
+            self._batch_places.setdefault(gmlist.id, []).append(gmplace)
+            self._unreconciled[gmlist.id] = gmlist.places_count
+
+    def _end_add_batch(self) -> None:
+        """Write the deltas of the adds since the last batch to the snapshot cache."""
+        with self._deltas_lock:
+            batch_places, self._batch_places = self._batch_places, {}
+            if not self.cache or not batch_places:
+                return
+
+            if self._cached_lists:
+                self._store_lists_snapshot()
+            else:
+                self.cache.invalidate_lists()
+
+            for list_id, places in batch_places.items():
+                self.cache.append_places(list_id, [_place_entry(place) for place in places])
+
+
+# Query strings of request URLs carry the session token (in `pb`) and the coords of the place
+_URL_QUERY = re.compile(r'(https?://[^\s?]+)\?\S*')
+
+
+@contextlib.contextmanager
+def _service_errors():
+    """
+    Raise the connection and HTTP errors of a request, and the `JSONDecodeError` of its body, as `ServiceError`.
+    URLs in the message lose their query string, so that it can be shown without leaking the session token.
+    """
+    import requests
+
+    try:
+        yield
+    except (requests.RequestException, json.JSONDecodeError) as e:
+        raise ServiceError(_URL_QUERY.sub(r'\1', str(e))) from e
+
+
+def _place_entry(place: GMPlace) -> dict:
+    return {'name': place.name,
+            'lat': place.coord.lat,
+            'long': place.coord.long,
+            'secret_1': place.secret_1,
+            'secret_2': place.secret_2}
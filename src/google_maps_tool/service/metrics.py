@@ -0,0 +1,151 @@
+"""
+In-process counters for where the time goes: latency, payload size, status codes and retries of every endpoint,
+cache hits and misses, and token page fetches. Shared by the context and the service through `context.metrics`.
+"""
+import bisect
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+# Upper bounds of the latency histogram buckets, in ms. Slower requests go to the last, open-ended bucket
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def endpoint_label(url: str) -> str:
+    """Last segment of the path, e.g. `getlist`, short enough for the stats screen."""
+    return urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1] or '/'
+
+
+@dataclass
+class Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    count: int = 0
+    total: float = 0.0
+    min: float | None = None
+    max: float | None = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the `p`-th percentile (0-100), capped by the largest value seen."""
+        if not self.count:
+            return 0.0
+
+        rank = p / 100 * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(LATENCY_BUCKETS_MS[idx], self.max) if idx < len(LATENCY_BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        labels = [f'<={bound}' for bound in LATENCY_BUCKETS_MS] + [f'>{LATENCY_BUCKETS_MS[-1]}']
+        return {'count': self.count, 'mean': self.mean, 'min': self.min, 'max': self.max,
+                'p50': self.percentile(50), 'p95': self.percentile(95), 'p99': self.percentile(99),
+                'buckets': dict(zip(labels, self.counts))}
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    latency_ms: Histogram = field(default_factory=Histogram)
+    bytes: int = 0
+    status_codes: Counter = field(default_factory=Counter)
+    retries: int = 0
+    # Requests that got no response at all (connection errors, timeouts)
+    errors: int = 0
+
+    def to_dict(self) -> dict:
+        return {'requests': self.requests,
+                'latency_ms': self.latency_ms.to_dict(),
+                'bytes': self.bytes,
+                'status_codes': {str(status): count for status, count in sorted(self.status_codes.items())},
+                'retries': self.retries,
+                'errors': self.errors}
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hit_ratio}
+
+
+class Metrics:
+    def __init__(self):
+        self.started_at = time.time()
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.caches: dict[str, CacheStats] = {}
+        # Everything else, e.g. token page fetches
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def record_response(self, endpoint: str, status: int, seconds: float, size: int) -> None:
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.latency_ms.observe(seconds * 1000)
+            stats.bytes += size
+            stats.status_codes[status] += 1
+
+    def record_error(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.latency_ms.observe(seconds * 1000)
+            stats.errors += 1
+
+    def record_retry(self, endpoint: str) -> None:
+        with self._lock:
+            self.endpoints.setdefault(endpoint, EndpointStats()).retries += 1
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            stats = self.caches.setdefault(cache, CacheStats())
+            if hit:
+                stats.hits += 1
+            else:
+                stats.misses += 1
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self.endpoints.clear()
+            self.caches.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'started_at': self.started_at,
+                    'uptime_seconds': time.time() - self.started_at,
+                    'endpoints': {name: stats.to_dict() for name, stats in sorted(self.endpoints.items())},
+                    'caches': {name: stats.to_dict() for name, stats in sorted(self.caches.items())},
+                    'counters': dict(sorted(self.counters.items()))}
+
+    def dump(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable
+
+from src.google_maps_tool.models.place import GMPlace
+from src.google_maps_tool.service.bulk import TokenBucket
+
+DEFAULT_PREFETCH_WORKERS = 2
+DEFAULT_PREFETCH_REQUESTS_PER_SECOND = 4.0
+
+
+class DetailsPrefetcher:
+    """
+    Loads the details of places in the background, in the order they are given (i.e. the order they are shown in),
+    so that opening one later is instant. The details are kept on the places and go through the service's details
+    cache. Failures are ignored: the place is simply loaded again when it is opened.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_PREFETCH_WORKERS, rate_limiter: TokenBucket | None = None):
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='details-prefetch')
+        self._rate_limiter = rate_limiter or TokenBucket(DEFAULT_PREFETCH_REQUESTS_PER_SECOND, burst=max_workers)
+        self._futures: list[Future] = []
+        self._cancelled = threading.Event()
+
+    def start(self, gmplaces: Iterable[GMPlace]) -> None:
+        """Prefetch `gmplaces`, dropping whatever was still queued from a previous call."""
+        self.cancel()
+
+        cancelled = self._cancelled = threading.Event()
+        self._futures = [self._executor.submit(self._prefetch, gmplace, cancelled)
+                         for gmplace in gmplaces if not gmplace.has_details]
+
+    def cancel(self) -> None:
+        """Drop the queued places. Requests already sent still complete and fill the cache."""
+        self._cancelled.set()
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+    @property
+    def pending(self) -> int:
+        return sum(not future.done() for future in self._futures)
+
+    def close(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> 'DetailsPrefetcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _prefetch(self, gmplace: GMPlace, cancelled: threading.Event) -> None:
+        if cancelled.is_set():
+            return
+
+        self._rate_limiter.acquire()
+        if cancelled.is_set() or gmplace.has_details:
+            return
+
+        try:
+            gmplace.load_details()
+        except Exception:
+            pass
@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the function, the others
+    wait for it and get the same result (or exception). Nothing is kept once the call is over,
+    so a later call runs again.
+    """
+
+    def __init__(self, on_shared: Callable[[Hashable], None] | None = None):
+        # Called with the key whenever a caller joins a call already in flight
+        self._on_shared = on_shared
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[key] = Future()
+
+        if not is_leader:
+            if self._on_shared:
+                self._on_shared(key)
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        return future.result()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
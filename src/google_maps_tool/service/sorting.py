@@ -0,0 +1,91 @@
+from dataclasses import dataclass, field
+from typing import Callable
+
+from src.google_maps_tool.models.list import GMList
+from src.google_maps_tool.models.place import GMPlace
+from src.google_maps_tool.service.bulk import AddPlaceResult
+
+
+@dataclass
+class PresetSortPlan:
+    preset: str
+    destination: GMList
+    # Places of the source list inside the preset
+    matches: list[GMPlace]
+    # Matches that the destination list doesn't contain yet
+    to_add: list[GMPlace]
+
+
+@dataclass
+class PresetSortResult:
+    plan: PresetSortPlan
+    results: list[AddPlaceResult] = field(default_factory=list)
+
+    @property
+    def added(self) -> list[GMPlace]:
+        return [result.place for result in self.results if result.success]
+
+    @property
+    def failed(self) -> list[AddPlaceResult]:
+        return [result for result in self.results if not result.success]
+
+
+def assign_to_presets(gmlist: GMList, presets: dict[str, dict], nearest_only=False) -> dict[str, list[GMPlace]]:
+    """
+    Match every place of `gmlist` against all presets ({name: {lat, lon, radius_km}}) in a single pass.
+    A place goes to every preset whose radius it is in, or only to the nearest of them if `nearest_only`.
+    """
+    names = list(presets)
+    radii = [presets[name]['radius_km'] for name in names]
+    matrix = gmlist.distance_matrix([(presets[name]['lat'], presets[name]['lon']) for name in names])
+
+    assigned: dict[str, list[GMPlace]] = {name: [] for name in names}
+    for place, distances in zip(gmlist.places, matrix):
+        inside = [idx for idx, radius in enumerate(radii) if distances[idx] <= radius]
+        if nearest_only and inside:
+            inside = [min(inside, key=lambda idx: distances[idx])]
+
+        for idx in inside:
+            assigned[names[idx]].append(place)
+
+    return assigned
+
+
+def find_destination_lists(gmlists: list[GMList], presets: dict[str, dict]) -> dict[str, GMList]:
+    """Pair each preset with the list of the same name (case-insensitive), if there is one."""
+    by_name = {gmlist.name.strip().lower(): gmlist for gmlist in gmlists}
+    return {name: by_name[name.strip().lower()] for name in presets if name.strip().lower() in by_name}
+
+
+def plan_preset_sort(src_list: GMList, destinations: dict[str, GMList], presets: dict[str, dict],
+                     nearest_only=False) -> list[PresetSortPlan]:
+    """
+    Work out which places of `src_list` each destination is missing.
+    The source is loaded once, and each destination list is fetched once, even if several presets share it.
+    """
+    assigned = assign_to_presets(src_list, {name: presets[name] for name in destinations}, nearest_only)
+
+    # Places already planned per destination, in case several presets share one
+    planned: dict[str, set[GMPlace]] = {}
+    plans = []
+    for name, destination in destinations.items():
+        if destination.id not in planned:
+            destination.refresh()
+            planned[destination.id] = set()
+
+        to_add = [place for place in destination.missing_from(assigned[name]) if place not in planned[destination.id]]
+        planned[destination.id].update(to_add)
+        plans.append(PresetSortPlan(name, destination, assigned[name], to_add))
+
+    return plans
+
+
+def execute_preset_sort(service: 'GoogleMapsService', plans: list[PresetSortPlan],
+                        on_result: Callable[[AddPlaceResult], None] | None = None,
+                        **bulk_options) -> list[PresetSortResult]:
+    """Send only the missing adds of every plan, through `GoogleMapsService.add_places_to_list`."""
+    sort_results = []
+    for plan in plans:
+        results = service.add_places_to_list(plan.to_add, plan.destination, on_result=on_result, **bulk_options)
+        sort_results.append(PresetSortResult(plan, results))
+    return sort_results
@@ -0,0 +1,180 @@
+"""
+HTTP transport shared by the menu and scripts: the pooled session, per-endpoint timeouts,
+and retries with jittered exponential backoff for the requests that are safe to repeat.
+`requests` is only imported once a session is created, so commands answered from the caches start faster.
+"""
+import random
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
+from urllib.parse import urlsplit
+
+from src.google_maps_tool.service import endpoints
+from src.google_maps_tool.service.bulk import DEFAULT_MAX_WORKERS
+from src.google_maps_tool.service.metrics import Metrics, endpoint_label
+from src.google_maps_tool.service.prefetch import DEFAULT_PREFETCH_WORKERS
+
+if TYPE_CHECKING:
+    import requests
+    from requests.cookies import RequestsCookieJar
+
+DEFAULT_HEADERS = {
+    "accept": "*/*",
+    "accept-language": "en-GB,en;q=0.9,fr-FR;q=0.8,fr;q=0.7,ro-RO;q=0.6,ro;q=0.5,en-US;q=0.4",
+    "priority": "u=1, i",
+    "x-maps-diversion-context-bin": "CAE=",
+    "Referer": "https://www.google.com/",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36",
+}
+
+# Overloaded or failing server, worth another try
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    # Only for requests that can be repeated without side effects
+    retry: bool = False
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return self.connect_timeout, self.read_timeout
+
+
+def endpoint_key(url: str) -> str:
+    """Endpoints are told apart by their path, so that policies don't depend on the host."""
+    return urlsplit(url).path
+
+
+def _default_policies() -> dict[str, EndpointPolicy]:
+    return {
+        endpoint_key(endpoints.MAPS_PAGE_URL): EndpointPolicy(read_timeout=30.0, retry=True),
+        endpoint_key(endpoints.GET_ALL_LISTS_URL): EndpointPolicy(read_timeout=20.0, retry=True),
+        # Pages of large lists take a while to build
+        endpoint_key(endpoints.GET_LIST_URL): EndpointPolicy(read_timeout=60.0, retry=True),
+        endpoint_key(endpoints.GET_PLACE_DETAILS_URL): EndpointPolicy(read_timeout=20.0, retry=True),
+        # Repeating a createitem that timed out could add the place twice
+        endpoint_key(endpoints.CREATE_ITEM_URL): EndpointPolicy(read_timeout=20.0, retry=False),
+    }
+
+
+def pool_size_for(workers: int = DEFAULT_MAX_WORKERS) -> int:
+    """
+    Connections to keep open so that `workers` threads sending at once (bulk adds, export details) never wait
+    for a free one, even while the details prefetch is running next to them.
+    """
+    return max(workers, DEFAULT_MAX_WORKERS) + DEFAULT_PREFETCH_WORKERS
+
+
+@dataclass
+class TransportConfig:
+    # Connections kept open to the server, see `pool_size_for`
+    pool_size: int = field(default_factory=pool_size_for)
+    policies: dict[str, EndpointPolicy] = field(default_factory=_default_policies)
+    default_policy: EndpointPolicy = EndpointPolicy()
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    # Longest wait between two attempts, a longer Retry-After gives up instead
+    backoff_max: float = 30.0
+    retry_statuses: frozenset[int] = RETRY_STATUSES
+
+    def policy_for(self, url: str) -> EndpointPolicy:
+        return self.policies.get(endpoint_key(url), self.default_policy)
+
+    def attempts_for(self, url: str) -> int:
+        return 1 + self.max_retries if self.policy_for(url).retry else 1
+
+    def backoff(self, attempt: int, retry_after: str | None = None) -> float | None:
+        """
+        Seconds to wait before retry number `attempt` (0-based): the server's `Retry-After` if it sent one,
+        otherwise a random delay up to `backoff_base * 2 ** attempt` ("full jitter"). None means don't retry.
+        """
+        if retry_after is not None:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return delay if delay <= self.backoff_max else None
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def parse_retry_after(value: str) -> float | None:
+    """`Retry-After` is either a number of seconds or an HTTP date."""
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    import email.utils
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def create_session(cookies: 'RequestsCookieJar', config: TransportConfig) -> 'requests.Session':
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.cookies = cookies
+    session.headers = dict(DEFAULT_HEADERS)
+
+    adapter = HTTPAdapter(pool_maxsize=config.pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def send_with_retries(session: 'requests.Session', url: str, params: dict | None, config: TransportConfig,
+                      stream: bool = False, sleep: Callable[[float], None] = time.sleep,
+                      metrics: Metrics | None = None) -> 'requests.Response':
+    """
+    GET `url` with the endpoint's timeouts. Retryable endpoints are tried again on connection errors,
+    timeouts and `RETRY_STATUSES`; once out of attempts, or asked to wait longer than `backoff_max`,
+    the last error is raised (`requests.HTTPError` for a status). Other endpoints get their response back as is.
+    Every attempt is recorded in `metrics`, if given.
+    """
+    import requests
+
+    policy = config.policy_for(url)
+    attempts = config.attempts_for(url)
+    label = endpoint_label(url)
+
+    for attempt in range(attempts):
+        is_last = attempt == attempts - 1
+        if attempt and metrics:
+            metrics.record_retry(label)
+
+        started = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=policy.timeout, stream=stream)
+        except (requests.ConnectionError, requests.Timeout):
+            if metrics:
+                metrics.record_error(label, time.perf_counter() - started)
+            if is_last:
+                raise
+            delay = config.backoff(attempt)
+        else:
+            if metrics:
+                metrics.record_response(label, response.status_code, time.perf_counter() - started,
+                                        _response_size(response, stream))
+            if not policy.retry or response.status_code not in config.retry_statuses:
+                return response
+
+            delay = None if is_last else config.backoff(attempt, response.headers.get('Retry-After'))
+            if delay is None:
+                response.raise_for_status()
+            response.close()
+
+        sleep(delay)
+
+
+def _response_size(response: 'requests.Response', stream: bool) -> int:
+    # A streamed body hasn't been read yet, only its announced length is known
+    if stream:
+        length = response.headers.get('Content-Length', '')
+        return int(length) if length.isdigit() else 0
+    return len(response.content)
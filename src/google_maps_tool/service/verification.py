@@ -0,0 +1,70 @@
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from src.google_maps_tool.models.list import GMList
+from src.google_maps_tool.models.place import GMPlace
+from src.google_maps_tool.service.bulk import AddPlaceResult
+
+DEFAULT_MAX_RETRIES = 2
+
+
+@dataclass
+class VerifiedAddReport:
+    # Every place we meant to add, without duplicates
+    intended: list[GMPlace]
+    # Places that were still not in the list after the last retry
+    missing: list[GMPlace] = field(default_factory=list)
+    # Result of the last add attempt of every place that was sent
+    results: list[AddPlaceResult] = field(default_factory=list)
+    # Places that had to be sent more than once
+    retried: int = 0
+    # Downloads of the destination list used to verify
+    verifications: int = 0
+
+    @property
+    def verified(self) -> list[GMPlace]:
+        missing = set(self.missing)
+        return [place for place in self.intended if place not in missing]
+
+
+def add_places_verified(service: 'GoogleMapsService', gmplaces: Iterable[GMPlace], gmlist: GMList,
+                        verify_every: int | None = None,
+                        max_retries: int = DEFAULT_MAX_RETRIES,
+                        on_result: Callable[[AddPlaceResult], None] | None = None,
+                        on_requeue: Callable[[list[GMPlace]], None] | None = None,
+                        **bulk_options) -> VerifiedAddReport:
+    """
+    Add `gmplaces` to `gmlist` in batches of `verify_every` places (all at once if None). After each batch,
+    the destination is downloaded once and diffed by place identity against the batch; only the places that are
+    actually missing are sent again, at most `max_retries` times. `on_requeue` is called with them before each retry.
+    A failed request whose place did end up in the list counts as added.
+    """
+    intended = list(dict.fromkeys(gmplaces))
+    report = VerifiedAddReport(intended)
+    last_results: dict[GMPlace, AddPlaceResult] = {}
+
+    step = verify_every or len(intended) or 1
+    for start in range(0, len(intended), step):
+        pending = intended[start:start + step]
+
+        for attempt in range(1 + max_retries):
+            if attempt:
+                report.retried += len(pending)
+                if on_requeue:
+                    on_requeue(pending)
+
+            for result in service.add_places_to_list(pending, gmlist, on_result=on_result, **bulk_options):
+                last_results[result.place] = result
+
+            # One download of the destination settles the whole batch, and replaces the local deltas
+            gmlist.refresh()
+            report.verifications += 1
+            present = set(gmlist.places)
+            pending = [place for place in pending if place not in present]
+            if not pending:
+                break
+
+        report.missing.extend(pending)
+
+    report.results = [last_results[place] for place in intended if place in last_results]
+    return report
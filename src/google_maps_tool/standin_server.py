@@ -0,0 +1,385 @@
+"""
+Local stand-in for the Google Maps endpoints the tool uses, for developing, testing and load testing
+without a Google account. Serves synthetic lists of any size with the same `)]}'`-prefixed payloads
+as the real service, and can inject latency, 429s and 5xx errors.
+
+Run with: python -m src.google_maps_tool.standin_server --lists 5 --places 1000 --latency 0.05
+then point the service at it with `GoogleMapsContext(session, base_url='http://127.0.0.1:8765')`.
+"""
+import argparse
+import base64
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from src.google_maps_parser import pb_decoder
+from src.google_maps_tool.helpers import maybe, place_identity, to_uint64
+from src.google_maps_tool.service.json_select import RESPONSE_PREFIX
+
+DEFAULT_PORT = 8765
+
+# Rough bounding box around Europe, where the presets in locations.json live
+_LAT_RANGE = (34.0, 60.0)
+_LON_RANGE = (-10.0, 35.0)
+_CATEGORIES = ('Restaurant', 'Café', 'Museum', 'Park', 'Bar', 'Bakery', 'Hotel', 'Viewpoint')
+
+
+@dataclass
+class StandInPlace:
+    name: str
+    lat: float
+    long: float
+    # Signed, like in `getlist` responses. None for coords-only places
+    secret_1: int | None
+    secret_2: int | None
+
+    @property
+    def identity_key(self) -> tuple:
+        """Same identity as `GMPlace.identity_key`."""
+        return place_identity(self.lat, self.long, self.name, self.secret_1, self.secret_2)
+
+
+@dataclass
+class StandInList:
+    id: str
+    name: str
+    places: list[StandInPlace] = field(default_factory=list)
+
+
+@dataclass
+class FaultConfig:
+    # Added to every response, plus a random amount up to `latency_jitter_seconds`
+    latency_seconds: float = 0.0
+    latency_jitter_seconds: float = 0.0
+    # Share of the requests answered with 429 (with a Retry-After) or a random 5xx
+    rate_limit_ratio: float = 0.0
+    server_error_ratio: float = 0.0
+    retry_after_seconds: int = 1
+    seed: int | None = None
+
+
+def make_synthetic_places(count: int, rng: random.Random, list_idx: int = 0) -> list[StandInPlace]:
+    """Named places with secrets, spread over `_LAT_RANGE` x `_LON_RANGE`. Also used by the offline benchmarks."""
+    return [StandInPlace(f'{rng.choice(_CATEGORIES)} {list_idx}-{place_idx}',
+                         round(rng.uniform(*_LAT_RANGE), 7),
+                         round(rng.uniform(*_LON_RANGE), 7),
+                         rng.getrandbits(64) - (1 << 63),
+                         rng.getrandbits(64) - (1 << 63))
+            for place_idx in range(count)]
+
+
+def make_synthetic_lists(list_sizes: list[int], seed: int = 42) -> list[StandInList]:
+    rng = random.Random(seed)
+    return [StandInList(f'standin-list-{list_idx}', f'List {list_idx}', make_synthetic_places(size, rng, list_idx))
+            for list_idx, size in enumerate(list_sizes)]
+
+
+def _response(payload) -> str:
+    return f"{RESPONSE_PREFIX}\n{json.dumps(payload, ensure_ascii=False, separators=(',', ':'))}"
+
+
+def _address(place: StandInPlace) -> list[str]:
+    return [f'Str. {place.name}', f'{abs(place.lat):.2f}N {abs(place.long):.2f}E']
+
+
+def render_lists_response(lists: list[StandInList]) -> str:
+    entries = [[[gmlist.id], None, None, None, gmlist.name, None, None, None, None, None, None, None,
+                len(gmlist.places)] for gmlist in lists]
+    return _response([None] * 29 + [[None, None, None, entries]])
+
+
+def render_list_response(gmlist: StandInList, page: list[StandInPlace]) -> str:
+    items = []
+    for place in page:
+        secrets_pair = [str(place.secret_1), str(place.secret_2)] if place.secret_1 and place.secret_2 else None
+        items.append([None,
+                      [None, None, _address(place)[0], None, ', '.join(_address(place)),
+                       [None, None, place.lat, place.long], secrets_pair],
+                      place.name,
+                      '',
+                      None, None, None, None,
+                      [None, secrets_pair]])
+    return _response([[[gmlist.id], None, None, None, gmlist.name, None, None, None, items, None, None, None,
+                       len(gmlist.places)]])
+
+
+def render_place_response(place: StandInPlace, saved_in: list[StandInList]) -> str:
+    rng = random.Random(f'{place.lat}:{place.long}')
+    entry: list = [None] * 184
+    entry[2] = _address(place)
+    entry[4] = [None, None, '$' * rng.randint(1, 4), None, None, None, None, round(rng.uniform(3, 5), 1),
+                rng.randint(1, 5000)]
+    entry[7] = [None, f'https://example.com/{place.name.replace(" ", "-").lower()}']
+    entry[11] = place.name
+    entry[13] = [place.name.split(' ')[0]]
+    entry[25] = [None] * 15 + [[[[None, gmlist.name]] for gmlist in saved_in]]
+    entry[34] = [None, [[day, ['9 AM–6 PM']] for day in ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')]]
+    entry[178] = [[f'+40 7{rng.randint(10_000_000, 99_999_999)}']]
+    entry[183] = [None, None, [None, None, [f'8GQ{rng.randint(1000, 9999)}+{rng.randint(10, 99)}']]]
+    return _response([None] * 6 + [entry])
+
+
+def render_maps_page(session_token: str, add_to_list_token: str) -> str:
+    app_options: list = [None] * 30
+    app_options[11] = session_token
+    app_options[28] = [None] * 28 + [add_to_list_token]
+    app_options[29] = [[None]]
+    return (f'<!DOCTYPE html><html><head><script>window.APP_OPTIONS={json.dumps(app_options)};</script>'
+            f'</head><body></body></html>')
+
+
+def render_error_page(status: int) -> str:
+    """HTML error page, like the real service sends with its 4xx/5xx instead of a JSON body."""
+    return (f'<!DOCTYPE html><html lang=en><meta charset=utf-8><title>Error {status}</title>'
+            f'<p><b>{status}.</b> <ins>That’s an error.</ins></p>'
+            f'<p>{HTTPStatus(status).phrase}. <ins>That’s all we know.</ins></p></html>')
+
+
+def _error(status: int, headers: dict | None = None) -> tuple[int, str, dict]:
+    return status, render_error_page(status), headers or {}
+
+
+class StandInServer:
+    """
+    Threaded HTTP server holding the lists in memory. Adds go into the list (once per place, like the real
+    service) and move it to the top of the lists, so the service sees its own changes.
+    Requests with other tokens than the current ones get a 401, see `rotate_tokens`.
+    """
+
+    def __init__(self, lists: list[StandInList], faults: FaultConfig | None = None,
+                 host: str = '127.0.0.1', port: int = DEFAULT_PORT):
+        self.lists = lists
+        self.faults = faults or FaultConfig()
+        self.session_token = 'standin-session'
+        self.add_to_list_token = 'standin-add-to-list'
+        # Requests per path, and injected faults per status
+        self.requests = Counter()
+        self.injected = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.faults.seed)
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'StandInServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='standin-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def rotate_tokens(self) -> None:
+        """Expire the current tokens, as if the session had been renewed."""
+        with self._lock:
+            self.session_token = f'standin-session-{secrets.token_hex(4)}'
+            self.add_to_list_token = f'standin-add-to-list-{secrets.token_hex(4)}'
+
+    def find_list(self, list_id: str) -> StandInList | None:
+        return next((gmlist for gmlist in self.lists if gmlist.id == list_id), None)
+
+    def _injected_fault(self) -> tuple[int, dict] | None:
+        faults = self.faults
+        with self._lock:
+            roll = self._rng.random()
+            delay = faults.latency_seconds + self._rng.uniform(0, faults.latency_jitter_seconds)
+            server_error = self._rng.choice((500, 502, 503))
+
+        if delay:
+            time.sleep(delay)
+
+        if roll < faults.rate_limit_ratio:
+            return 429, {'Retry-After': str(faults.retry_after_seconds)}
+        if roll < faults.rate_limit_ratio + faults.server_error_ratio:
+            return server_error, {}
+        return None
+
+    def handle(self, path: str, query: dict[str, str]) -> tuple[int, str, dict]:
+        """Status, body and headers of the response to a GET on `path`."""
+        with self._lock:
+            self.requests[path] += 1
+
+        fault = self._injected_fault()
+        if fault is not None:
+            status, headers = fault
+            with self._lock:
+                self.injected[status] += 1
+            return _error(status, headers)
+
+        if path == '/maps':
+            return 200, render_maps_page(self.session_token, self.add_to_list_token), {}
+
+        try:
+            pb = pb_decoder.decode(query.get('pb', ''))
+            with self._lock:
+                if path == '/locationhistory/preview/mas':
+                    return self._mas(pb)
+                if path == '/maps/preview/entitylist/getlist':
+                    return self._getlist(pb)
+                if path == '/maps/preview/place':
+                    return self._place(pb, query)
+                if path == '/maps/preview/entitylist/createitem':
+                    return self._createitem(pb)
+        except (ValueError, TypeError, KeyError):
+            # A `pb` that doesn't decode, or lacks the fields the endpoint reads
+            return _error(400)
+        return _error(404)
+
+    def _has_session_token(self, value: str | None) -> bool:
+        # `s` type prefix, and createitem appends `:34`
+        return value is not None and value[1:].split(':')[0] == self.session_token
+
+    def _mas(self, pb: dict) -> tuple[int, str, dict]:
+        if not self._has_session_token(maybe(pb, '2', '1')):
+            return _error(401)
+        return 200, render_lists_response(self.lists), {}
+
+    def _getlist(self, pb: dict) -> tuple[int, str, dict]:
+        if not self._has_session_token(maybe(pb, '6', '1')):
+            return _error(401)
+
+        gmlist = self.find_list(maybe(pb, '1', '1')[1:])
+        if gmlist is None:
+            return _error(404)
+
+        page_size = int(maybe(pb, '4')[1:])
+        offset = int((maybe(pb, '5') or 'i0')[1:])
+        return 200, render_list_response(gmlist, gmlist.places[offset:offset + page_size]), {}
+
+    def _place(self, pb: dict, query: dict[str, str]) -> tuple[int, str, dict]:
+        if not self._has_session_token(maybe(pb, '14', '1')):
+            return _error(401)
+
+        place = self._find_place_by_secrets(maybe(pb, '1', '1'))
+        if place is None:
+            lat, long = (float(value) for value in query.get('q', '0,0').split(','))
+            name = (maybe(pb, '39') or 's')[1:].replace('+', ' ')
+            place = StandInPlace(name, lat, long, None, None)
+
+        saved_in = [gmlist for gmlist in self.lists
+                    if any(other.identity_key == place.identity_key for other in gmlist.places)]
+        return 200, render_place_response(place, saved_in), {}
+
+    def _find_place_by_secrets(self, value: str | None) -> StandInPlace | None:
+        if not value:
+            return None
+
+        secret_1, secret_2 = (int(part, 16) for part in value[1:].split(':'))
+        return next((place for gmlist in self.lists for place in gmlist.places
+                     if place.secret_1 and place.secret_2
+                     and (to_uint64(place.secret_1), to_uint64(place.secret_2)) == (secret_1, secret_2)), None)
+
+    def _createitem(self, pb: dict) -> tuple[int, str, dict]:
+        if not self._has_session_token(maybe(pb, '3', '1')) or maybe(pb, '4') != f's{self.add_to_list_token}':
+            return _error(401)
+
+        gmlist = self.find_list(maybe(pb, '1', '1')[1:])
+        if gmlist is None:
+            return _error(404)
+
+        lat = float(maybe(pb, '2', '2', '6', '3')[1:])
+        long = float(maybe(pb, '2', '2', '6', '4')[1:])
+        secrets_pair = maybe(pb, '2', '2', '7')
+        name = maybe(pb, '2', '3')
+        if secrets_pair:
+            place = StandInPlace(name[1:], lat, long,
+                                 _to_int64(int(secrets_pair['1'][1:])), _to_int64(int(secrets_pair['2'][1:])))
+        else:
+            # Coords-only places send their name as URL-safe base64, without padding
+            encoded = name[1:]
+            place = StandInPlace(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode('utf-8'),
+                                 lat, long, None, None)
+
+        if all(other.identity_key != place.identity_key for other in gmlist.places):
+            gmlist.places.append(place)
+
+        # Most recently changed list first
+        self.lists.remove(gmlist)
+        self.lists.insert(0, gmlist)
+        return 200, _response([[gmlist.id], None, len(gmlist.places)]), {}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so that the client's connection pool is used like against the real service
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately, don't let them wait for each other's ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                status, body, headers = server.handle(url.path, query)
+
+                data = body.encode('utf-8')
+                self.send_response(status)
+                is_html = url.path == '/maps' or status >= 400
+                self.send_header('Content-Type', 'text/html; charset=utf-8' if is_html
+                                 else 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _to_int64(value: int) -> int:
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Google Maps list endpoints.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--lists', type=int, default=3, help='number of synthetic lists')
+    parser.add_argument('--places', type=int, default=100, help='places per list')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra latency, up to this many seconds')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help='share of requests answered with 429')
+    parser.add_argument('--error-ratio', type=float, default=0.0, help='share of requests answered with a 5xx')
+    args = parser.parse_args()
+
+    faults = FaultConfig(latency_seconds=args.latency, latency_jitter_seconds=args.jitter,
+                         rate_limit_ratio=args.rate_limit_ratio, server_error_ratio=args.error_ratio, seed=args.seed)
+    server = StandInServer(make_synthetic_lists([args.places] * args.lists, seed=args.seed), faults,
+                           host=args.host, port=args.port)
+    print(f'Serving {args.lists} lists of {args.places} places on {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,23 @@
-import sys
-import time
+import functools
 from typing import Callable
 
 from src.google_maps_tool import helpers
 from src.google_maps_tool.config.config import load_location_presets
 from src.google_maps_tool.models.list import GMList
 from src.google_maps_tool.models.place import GMPlace
+from src.google_maps_tool.service.bulk import AddPlaceResult
+from src.google_maps_tool.service.context import ServiceError
 from src.google_maps_tool.service.maps_service import GoogleMapsService
+from src.google_maps_tool.service.prefetch import DetailsPrefetcher
+from src.google_maps_tool.service.sorting import execute_preset_sort, find_destination_lists, plan_preset_sort
+from src.google_maps_tool.service.verification import add_places_verified
 from src.google_maps_tool.ui import ui
 
-location_presets = load_location_presets()
+
+@functools.cache
+def get_location_presets() -> dict[str, dict]:
+    """`locations.json`, read when a menu first needs it rather than when the module is imported."""
+    return load_location_presets()
 
 
 def main_menu(service: GoogleMapsService):
@@ -19,6 +27,8 @@ def main_menu(service: GoogleMapsService):
         print('1. View my lists & saved places')
         print('2. Add places manually')
         print('3. Add places inside a specified radius automatically')
+        print('4. Sort a list into all location presets')
+        print('5. Stats')
         print('0. Exit')
 
         choice = input("> ").strip()
@@ -29,6 +39,10 @@ def main_menu(service: GoogleMapsService):
             add_manually_menu(service)
         elif choice == '3':
             add_automatically_menu(service)
+        elif choice == '4':
+            sort_by_presets_menu(service)
+        elif choice == '5':
+            stats_menu(service)
         elif choice == '0':
             break
         else:
@@ -43,7 +57,7 @@ def view_lists_menu(service: GoogleMapsService):
             ui.print_place_details(gmplace)
             input('\nPress Enter to return...')
 
-        places_menu(gmlist, show_place_details)
+        places_menu(gmlist, show_place_details, prefetch_details=True)
 
     lists_menu(service, show_places)
 
@@ -97,6 +111,7 @@ def add_automatically_menu(service: GoogleMapsService, debug=False):
         # 3) Location preset or custom coords
         use_location = input("\nUse a preset location? (y/N): ").strip().lower() == 'y'
         if use_location:
+            location_presets = get_location_presets()
             locations = list(location_presets.keys())
             print('\nPresets:')
             for i, c in enumerate(locations):
@@ -118,7 +133,7 @@ def add_automatically_menu(service: GoogleMapsService, debug=False):
         dst_list.refresh()
         # 4) Filter and add
         inside = src_list.filter_by_radius(center_lat, center_lon, radius_km)
-        places_to_add = [place for place in inside if place not in dst_list.places]
+        places_to_add = dst_list.missing_from(inside)
 
         print(f"\nFound {len(places_to_add)} places within {radius_km} km.")
         ui.print_places_single_line(places_to_add)
@@ -127,43 +142,133 @@ def add_automatically_menu(service: GoogleMapsService, debug=False):
             print('Aborted.')
             return
 
-        dst_list_len_before = len(dst_list.places)
-
-        bar_length = 30  # length of the progress bar in characters
+        done = 0
+        total = len(places_to_add)
 
-        for idx, p in enumerate(places_to_add):
-            service.add_place_to_list(p, dst_list)
-            time.sleep(0.25)
+        def on_result(result: AddPlaceResult) -> None:
+            nonlocal done
+            done += 1
+            ui.print_progress_bar(done, total)
 
-            progress = idx / len(places_to_add)
-            filled_length = int(bar_length * progress)
-            bar = '#' * filled_length + '-' * (bar_length - filled_length)
+            if debug and not result.success:
+                print(f'\nFailed to add {result.place}: {result.error}')
 
-            # Print progress bar on the same line
-            print(f"\r[{bar}] {idx}/{len(places_to_add)} done", end="")
-            sys.stdout.flush()  # make sure it shows immediately
+        def on_requeue(missing: list[GMPlace]) -> None:
+            nonlocal total
+            total += len(missing)
+            print(f'\n{len(missing)} places are not in `{dst_list.name}` yet, retrying them...')
 
-            if debug:
-                updated_places = service.get_all_places(dst_list)
-                print(f'len(updated_places): {len(updated_places)}, dst_list_len_before: {dst_list_len_before}')
-                if idx + 1 != len(updated_places) - dst_list_len_before:
-                    print(f'Failed to add {p} to list. Aborting.')
-                    break
+        # The destination is downloaded once per batch to check the adds, instead of after each one
+        report = add_places_verified(service, places_to_add, dst_list, on_result=on_result, on_requeue=on_requeue)
 
-        dst_list.refresh()
         helpers.clear_screen()
         print(f'\nDone! Destination list `{dst_list.name}` is now: \n')
         ui.print_places_for_user(dst_list.places)
-        if len(dst_list.places) != (dst_list_len_before + len(places_to_add)):
-            places_not_added = [place for place in places_to_add if place not in dst_list.places]
+        if report.missing:
+            errors = {result.place: result.error for result in report.results}
             print('An error occurred while adding places. The following places were not added:')
-            print(', '.join([place.name for place in places_not_added]))
-            # print(f'dst_list: {dst_list.places}')
-            # print(f'places_to_add: {places_to_add}')
+            for place in report.missing:
+                print(f'  - {place.name}: {errors.get(place) or "not found in the list"}')
 
         input('\nPress Enter to return...')
 
 
+def sort_by_presets_menu(service: GoogleMapsService):
+    helpers.clear_screen()
+    print("\n--- Sort into all presets ---")
+
+    lists = service.get_all_lists()
+    print('Lists of saved places:\n')
+    ui.print_lists_for_user(lists)
+    print('0. Back')
+
+    src_idx = ui.handle_user_choice('\nChoose the SOURCE list: ', len(lists), allow_back=True)
+    if src_idx == -1:
+        return
+
+    src_list = lists[src_idx]
+    print(f'Chosen SOURCE list: `{src_list.name}`\n')
+
+    # Presets go to the list of the same name, otherwise ask for one
+    location_presets = get_location_presets()
+    matched = find_destination_lists(lists, location_presets)
+    destinations: dict[str, GMList] = {}
+    for name in location_presets:
+        if name in matched:
+            destinations[name] = matched[name]
+            print(f'{name} → `{matched[name].name}`')
+            continue
+
+        dst_idx = ui.handle_user_choice(f'No list named `{name}`. Choose its DESTINATION list (0 to skip): ',
+                                        len(lists), allow_back=True)
+        if dst_idx != -1:
+            destinations[name] = lists[dst_idx]
+
+    if not destinations:
+        input('\nNo destination lists chosen. Press Enter to return...')
+        return
+
+    nearest_only = input('\nAdd each place only to its nearest preset? (y/N): ').strip().lower() == 'y'
+
+    src_list.refresh()
+    plans = plan_preset_sort(src_list, destinations, location_presets, nearest_only)
+
+    print()
+    for plan in plans:
+        print(f'{plan.preset} → `{plan.destination.name}`: {len(plan.matches)} inside, {len(plan.to_add)} to add')
+
+    total = sum(len(plan.to_add) for plan in plans)
+    if total == 0:
+        input('\nNothing to add. Press Enter to return...')
+        return
+
+    if input(f'Add {total} places? (y/N): ').lower() != 'y':
+        print('Aborted.')
+        return
+
+    done = 0
+
+    def on_result(result: AddPlaceResult) -> None:
+        nonlocal done
+        done += 1
+        ui.print_progress_bar(done, total)
+
+    sort_results = execute_preset_sort(service, plans, on_result=on_result)
+
+    helpers.clear_screen()
+    print('\nDone! Summary:\n')
+    for sort_result in sort_results:
+        plan = sort_result.plan
+        print(f'{plan.preset} → `{plan.destination.name}`: {len(sort_result.added)} added, '
+              f'{len(sort_result.failed)} failed, {len(plan.matches) - len(plan.to_add)} already there')
+        for failed in sort_result.failed:
+            print(f'  - {failed.place.name}: {failed.error}')
+
+    input('\nPress Enter to return...')
+
+
+def stats_menu(service: GoogleMapsService):
+    while True:
+        helpers.clear_screen()
+        print('\n--- Stats ---\n')
+        ui.print_stats(service.metrics.snapshot())
+        if service.details_cache:
+            print(f'{"details_cache.evictions":<24}: {service.details_cache.evictions}')
+
+        choice = input('\nEnter to refresh, `s` to save as JSON, `c` to clear, 0 to return: ').strip().lower()
+        if choice == 's':
+            path = input('File (gmaps_metrics.json): ').strip() or 'gmaps_metrics.json'
+            try:
+                service.metrics.dump(path)
+                input(f'Saved to {path}. Press Enter to continue...')
+            except OSError as e:
+                input(f'Could not save to {path} → {e}. Press Enter to continue...')
+        elif choice == 'c':
+            service.metrics.reset()
+        elif choice == '0':
+            return
+
+
 def lists_menu(service: GoogleMapsService, on_select: Callable[[GMList], None] = None):
     while True:
         helpers.clear_screen()
@@ -171,12 +276,20 @@ def lists_menu(service: GoogleMapsService, on_select: Callable[[GMList], None] =
 
         gmlists = service.get_all_lists()
         ui.print_lists_for_user(gmlists)
+        print('R. Refresh (download the lists again)')
         print('0. Back')
 
-        choice_list_idx = ui.handle_user_choice('> '.strip(), len(gmlists), allow_back=True)
+        choice_list_idx = ui.handle_user_choice('> '.strip(), len(gmlists), allow_back=True, allow_refresh=True)
 
         if choice_list_idx == -1:
             return
+        if choice_list_idx == ui.REFRESH_CHOICE:
+            try:
+                service.get_all_lists(use_cache=False)
+            except ServiceError as e:
+                print(f'Failed to get all lists → {e}')
+                input('\nPress Enter to return...')
+            continue
 
         chosen_gmlist = gmlists[choice_list_idx]
 
@@ -185,18 +298,34 @@ def lists_menu(service: GoogleMapsService, on_select: Callable[[GMList], None] =
             return
 
 
-def places_menu(gmlist: GMList, on_select: Callable[[GMPlace], None] = None) -> None:
-    while True:
-        helpers.clear_screen()
-        print(f'List `{gmlist.name}`: \n')
-        ui.print_places_for_user(gmlist.places)
-        print('0. Back')
+def places_menu(gmlist: GMList, on_select: Callable[[GMPlace], None] = None, prefetch_details=False) -> None:
+    # Details are loaded in the background while the list is on screen, and dropped once we leave it
+    with DetailsPrefetcher() as prefetcher:
+        if prefetch_details:
+            prefetcher.start(gmlist.places)
 
-        choice_place_idx = ui.handle_user_choice('> '.strip(), len(gmlist.places), allow_back=True)
-
-        if choice_place_idx == -1:
-            return
-
-        if on_select:
-            on_select(gmlist.places[choice_place_idx])
-            return
+        while True:
+            helpers.clear_screen()
+            print(f'List `{gmlist.name}`: \n')
+            ui.print_places_for_user(gmlist.places)
+            print('R. Refresh (download the places again)')
+            print('0. Back')
+
+            choice_place_idx = ui.handle_user_choice('> '.strip(), len(gmlist.places), allow_back=True,
+                                                     allow_refresh=True)
+
+            if choice_place_idx == -1:
+                return
+            if choice_place_idx == ui.REFRESH_CHOICE:
+                try:
+                    gmlist.refresh()
+                except ServiceError as e:
+                    print(f'Failed to refresh `{gmlist.name}` → {e}')
+                    input('\nPress Enter to return...')
+                if prefetch_details:
+                    prefetcher.start(gmlist.places)
+                continue
+
+            if on_select:
+                on_select(gmlist.places[choice_place_idx])
+                return
@@ -1,3 +1,6 @@
+import sys
+import time
+
 from src.google_maps_tool.models.list import GMList
 from src.google_maps_tool.models.place import GMPlace
 
@@ -55,12 +58,53 @@ def print_place_details(gmplace: GMPlace) -> None:
             print(f"  - {h}")
 
 
-def handle_user_choice(prompt: str, max: int, allow_back: bool = False) -> int:
+def print_progress_bar(done: int, total: int, bar_length: int = 30) -> None:
+    progress = done / total if total else 1
+    filled_length = int(bar_length * progress)
+    bar = '#' * filled_length + '-' * (bar_length - filled_length)
+
+    # Print progress bar on the same line
+    print(f"\r[{bar}] {done}/{total} done", end="")
+    sys.stdout.flush()  # make sure it shows immediately
+
+
+def print_stats(stats: dict) -> None:
+    print(f"Since {time.strftime('%H:%M:%S', time.localtime(stats['started_at']))} "
+          f"({stats['uptime_seconds'] / 60:.0f} min)\n")
+
+    print(f"{'Endpoint':<12} {'Requests':>8} {'Retries':>7} {'Errors':>6} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'max ms':>8} {'KiB':>9}  Statuses")
+    for name, endpoint in stats['endpoints'].items():
+        latency = endpoint['latency_ms']
+        statuses = ', '.join(f'{status}×{count}' for status, count in endpoint['status_codes'].items())
+        print(f"{name:<12} {endpoint['requests']:>8} {endpoint['retries']:>7} {endpoint['errors']:>6} "
+              f"{latency['p50']:>7.0f} {latency['p95']:>7.0f} {latency['max'] or 0:>8.0f} "
+              f"{endpoint['bytes'] / 1024:>9.1f}  {statuses}")
+    if not stats['endpoints']:
+        print('(no requests yet)')
+
+    print(f"\n{'Cache':<16} {'Hits':>6} {'Misses':>6} {'Hit ratio':>9}")
+    for name, cache in stats['caches'].items():
+        print(f"{name:<16} {cache['hits']:>6} {cache['misses']:>6} {cache['hit_ratio']:>9.0%}")
+
+    if stats['counters']:
+        print()
+        for name, value in stats['counters'].items():
+            print(f"{name:<24}: {value}")
+
+
+# Returned by `handle_user_choice` when the user types `r` and `allow_refresh` is set
+REFRESH_CHOICE = -2
+
+
+def handle_user_choice(prompt: str, max: int, allow_back: bool = False, allow_refresh: bool = False) -> int:
     min = -1 if allow_back is True else 0
 
     while True:
         try:
             choice = input(prompt)
+            if allow_refresh and choice.strip().lower() == 'r':
+                return REFRESH_CHOICE
             choice_int = int(choice) - 1
 
             if min <= choice_int < max: